@@ -0,0 +1,40 @@
+import numpy as np
+import struct
+
+def load(filename):
+    """
+    Lee un BMP sin compresión (24/32 bits, o 8 bits con paleta).
+    Retorna un arreglo uint8 (height, width, 3) RGB, fila 0 arriba.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+
+    if data[:2] != b'BM':
+        raise ValueError(f"{filename}: no es un BMP")
+    offset, = struct.unpack_from("<I", data, 10)
+    header_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", data, 14)
+    colors_used, = struct.unpack_from("<I", data, 46)
+
+    # BI_RGB, o BI_BITFIELDS con las máscaras estándar de 32 bits
+    if compression not in (0, 3) or (compression == 3 and bpp != 32):
+        raise ValueError(f"{filename}: compresión BMP no soportada ({compression})")
+    if bpp not in (8, 24, 32):
+        raise ValueError(f"{filename}: BMP de {bpp} bits no soportado")
+
+    top_down = height < 0
+    height = abs(height)
+    row_size = (width * bpp // 8 + 3) & ~3
+    rows = np.frombuffer(data, dtype=np.uint8, count=row_size * height, offset=offset)
+    rows = rows.reshape(height, row_size)
+
+    if bpp == 8:
+        n = colors_used or 256
+        palette = np.frombuffer(data, dtype=np.uint8, count=4 * n, offset=14 + header_size)
+        img = palette.reshape(n, 4)[rows[:, :width], 2::-1]
+    else:
+        step = bpp // 8
+        img = rows[:, :width * step].reshape(height, width, step)[:, :, 2::-1]
+
+    if not top_down:
+        img = img[::-1]
+    return np.ascontiguousarray(img)
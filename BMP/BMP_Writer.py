@@ -1,40 +1,85 @@
 import numpy as np
 import struct
 
+HEADER_SIZE = 14 + 40
+
+def _row_size(width):
+    """Bytes por fila: 3 por pixel, rellenado a múltiplo de 4."""
+    return (width * 3 + 3) & ~3
+
+def _header(width, height):
+    image_size = _row_size(width) * height
+    header = b'BM'
+    header += struct.pack("<I", HEADER_SIZE + image_size)
+    header += b'\x00\x00'
+    header += b'\x00\x00'
+    header += struct.pack("<I", HEADER_SIZE)
+
+    header += struct.pack("<I", 40)
+    header += struct.pack("<i", width)
+    header += struct.pack("<i", height)
+    header += struct.pack("<H", 1)
+    header += struct.pack("<H", 24)
+    header += struct.pack("<I", 0)
+    header += struct.pack("<I", image_size)
+    header += struct.pack("<i", 0)
+    header += struct.pack("<i", 0)
+    header += struct.pack("<I", 0)
+    header += struct.pack("<I", 0)
+    return header
+
+def _pixel_block(rows):
+    """
+    Convierte filas (k, width, 3) en [0,1], ordenadas de arriba hacia abajo,
+    al bloque BGR de abajo hacia arriba con el relleno de cada fila.
+    """
+    k, width = rows.shape[:2]
+    rows8 = (np.clip(rows, 0, 1) * 255).astype(np.uint8)
+    block = np.zeros((k, _row_size(width)), dtype=np.uint8)
+    block[:, :width * 3] = rows8[::-1, :, ::-1].reshape(k, width * 3)
+    return block.tobytes()
+
 def save(filename, width, height, framebuffer):
     """
     Guarda una imagen BMP simple (24 bits sin compresión).
     framebuffer: numpy array (height, width, 3), valores en [0,1]
     """
-    fb = np.clip(framebuffer, 0, 1)
-    fb = (fb * 255).astype(np.uint8)
-
     with open(filename, "wb") as f:
-        # Encabezado BMP
-        filesize = 14 + 40 + width * height * 3
-        f.write(b'BM')
-        f.write(struct.pack("<I", filesize))
-        f.write(b'\x00\x00')
-        f.write(b'\x00\x00')
-        f.write(struct.pack("<I", 14 + 40))
-
-        f.write(struct.pack("<I", 40))
-        f.write(struct.pack("<i", width))
-        f.write(struct.pack("<i", height))
-        f.write(struct.pack("<H", 1))
-        f.write(struct.pack("<H", 24))
-        f.write(struct.pack("<I", 0))
-        f.write(struct.pack("<I", width * height * 3))
-        f.write(struct.pack("<i", 0))
-        f.write(struct.pack("<i", 0))
-        f.write(struct.pack("<I", 0))
-        f.write(struct.pack("<I", 0))
-
-        # BMP se guarda de abajo hacia arriba
-        for y in range(height):
-            for x in range(width):
-                r, g, b = fb[height - 1 - y, x]
-                f.write(struct.pack('B', int(b)))
-                f.write(struct.pack('B', int(g)))
-                f.write(struct.pack('B', int(r)))
+        f.write(_header(width, height) + _pixel_block(np.asarray(framebuffer)[:height, :width]))
     print(f"Imagen guardada en {filename}")
+
+class BMPStream:
+    """
+    Escritura de un BMP por bandas de filas, sin tener la imagen completa
+    en memoria. El archivo se reserva al abrir y cada banda se escribe en
+    su posición (BMP guarda las filas de abajo hacia arriba).
+
+        with BMPStream("out.bmp", w, h) as bmp:
+            bmp.write_rows(y0, rows)   # rows: (k, w, 3) en [0,1]
+    """
+    def __init__(self, filename, width, height):
+        self.filename = filename
+        self.width = width
+        self.height = height
+        self.row_size = _row_size(width)
+        self.f = open(filename, "wb")
+        self.f.write(_header(width, height))
+        self.f.truncate(HEADER_SIZE + self.row_size * height)
+
+    def write_rows(self, y0, rows):
+        """Escribe las filas y0 .. y0+k-1 (contadas desde arriba)."""
+        rows = np.asarray(rows)
+        k = rows.shape[0]
+        self.f.seek(HEADER_SIZE + (self.height - (y0 + k)) * self.row_size)
+        self.f.write(_pixel_block(rows))
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+            print(f"Imagen guardada en {self.filename}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,5 @@
 import os
-import pygame
-from pygame.locals import *
+import sys
 import numpy as np
 
 from BMP.BMP_Writer import save as save_bmp
@@ -12,14 +11,7 @@ from Textures.envmap import EnvMap
 from Textures.texture import ImageTexture
 from Textures.checker import CheckerTexture
 from Textures.obj_loader import load_obj
-
-def hexc(h):
-    h = h.lstrip('#')
-    return tuple(int(h[i:i+2], 16)/255.0 for i in (0, 2, 4))
-
-def tone_map(img: np.ndarray, gamma: float = 2.2) -> np.ndarray:
-    img = np.clip(img, 0.0, 1.0)
-    return np.power(img, 1.0 / gamma)
+from Textures.color import hexc, tone_map
 
 WALL_LEFT = hexc('#D4A29A')
 WALL_RIGHT = hexc('#9B5449')
@@ -121,7 +113,33 @@ def build_final_scene(rt: Raytracer):
         DirectionalLight(direction=(-0.5, -0.6, 0.5), intensity=0.22),
     ]
 
-def render_and_show(width, height, out_path, gamma=2.2):
+# pygame sólo se importa al mostrar la ventana: build_final_scene se puede
+# usar sin pantalla (bench/)
+def show_framebuffer(screen, fb, width, height):
+    import pygame
+    img = (np.clip(fb, 0, 1) * 255).astype(np.uint8)
+    if img.shape[0] == height and img.shape[1] == width:
+        img = np.transpose(img, (1, 0, 2))
+    surf = pygame.surfarray.make_surface(img)
+    screen.blit(surf, (0, 0))
+    pygame.display.flip()
+
+def escape_pressed():
+    import pygame
+    for e in pygame.event.get():
+        if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+            return True
+    return False
+
+def render_and_show(width, height, out_path, gamma=2.2, progressive=False, mode="scalar", stats=False):
+    """
+    progressive=True: muestra una vista previa tras cada pasada
+    (8x8, 4x4, 2x2, completa); ESC detiene el refinamiento, también a mitad de
+    una pasada (la ventana se atiende tras cada fila o banda).
+    stats=True: cuenta rayos y pruebas de intersección y mide cada fase;
+    imprime la tabla al terminar.
+    """
+    import pygame
     pygame.init()
     screen = pygame.display.set_mode((width, height), pygame.SCALED)
     pygame.display.set_caption("Proyecto 2 - Ray Tracer")
@@ -129,6 +147,8 @@ def render_and_show(width, height, out_path, gamma=2.2):
 
     rt = Raytracer(width, height)
     build_final_scene(rt)
+    if stats:
+        rt.enable_stats()
 
     print(f"\n{'='*70}")
     print(f"  PROYECTO 2 - RAY TRACER")
@@ -139,37 +159,52 @@ def render_and_show(width, height, out_path, gamma=2.2):
     print(f"  Max Depth: {rt.max_depth}")
     print(f"{'='*70}\n")
 
-    try:
-        rt.render()
-    except AttributeError:
-        rt.rtRender()
+    stopped = False
+    if progressive:
+        def on_pass(step):
+            nonlocal stopped
+            show_framebuffer(screen, tone_map(rt.framebuffer, gamma=gamma), width, height)
+            stopped = stopped or escape_pressed()
+            return not stopped
+
+        # Atiende la ventana (y ESC) también dentro de cada pasada
+        def on_progress(step, done, total):
+            nonlocal stopped
+            stopped = stopped or escape_pressed()
+            return not stopped
+
+        rt.render_progressive(mode=mode, callback=on_pass, progress=on_progress)
+    else:
+        try:
+            rt.render(mode=mode)
+        except AttributeError:
+            rt.rtRender()
 
     fb = tone_map(rt.framebuffer, gamma=gamma)
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    save_bmp(out_path, width, height, fb)
+    if rt.stats is None:
+        save_bmp(out_path, width, height, fb)
+    else:
+        rt.stats.timed("bmp_write", save_bmp, out_path, width, height, fb)
     
     print(f"\n{'='*70}")
     print(f"  RENDER COMPLETADO")
     print(f"  Archivo: {out_path}")
     print(f"{'='*70}\n")
+    if rt.stats is not None:
+        print(rt.stats.summary() + "\n")
 
-    img = (np.clip(fb, 0, 1) * 255).astype(np.uint8)
-    if img.shape[0] == height and img.shape[1] == width:
-        img = np.transpose(img, (1, 0, 2))
-    surf = pygame.surfarray.make_surface(img)
-    screen.blit(surf, (0, 0))
-    pygame.display.flip()
+    show_framebuffer(screen, fb, width, height)
 
-    running = True
+    running = not stopped
     while running:
-        for e in pygame.event.get():
-            if e.type == QUIT or (e.type == KEYDOWN and e.key == K_ESCAPE):
-                running = False
+        running = not escape_pressed()
         clock.tick(60)
 
     pygame.quit()
 
-def main():
+def main(stats=False):
+    """stats=True (o --stats en la línea de comandos) imprime las estadísticas del render."""
     print("\n" + "="*70)
     print("  PROYECTO 2 - RAY TRACER")
     print("="*70 + "\n")
@@ -180,7 +215,7 @@ def main():
     OUTPUT_PREVIEW = os.path.join("renders", "proyecto2_preview.bmp")
     OUTPUT_FINAL = os.path.join("renders", "proyecto2_final.bmp")
 
-    render_and_show(*RES_PREVIEW, OUTPUT_PREVIEW, gamma=2.1)
+    render_and_show(*RES_PREVIEW, OUTPUT_PREVIEW, gamma=2.1, progressive=True, stats=stats)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(stats="--stats" in sys.argv[1:])
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+import sys
 import numpy as np
 
 EPS = 1e-8
@@ -14,6 +16,16 @@ def normalize(v):
         return np.zeros_like(v, dtype=np.float32)
     return (v / n).astype(np.float32)
 
+def normalize_many(v):
+    """Normaliza cada fila de un arreglo (N, 3). Las filas cero quedan en cero."""
+    v = np.asarray(v, dtype=np.float64)
+    n = np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.divide(v, n, out=np.zeros_like(v), where=n >= EPS)
+
+def dot_many(a, b):
+    """Producto punto fila por fila entre dos arreglos (N, 3)."""
+    return np.einsum('...j,...j->...', a, b)
+
 def dot(a, b):
     """Producto punto entre dos vectores."""
     return float(np.dot(np.asarray(a), np.asarray(b)))
@@ -38,8 +50,8 @@ def reflect(I, N):
     Returns:
         Vector reflejado normalizado
     """
-    I = normalize(np.asarray(I, dtype=np.float32))
-    N = normalize(np.asarray(N, dtype=np.float32))
+    I = normalize(I)
+    N = normalize(N)
     
     R = I - 2.0 * dot(I, N) * N
     return normalize(R)
@@ -56,8 +68,8 @@ def refract(I, N, eta_ratio):
     Returns:
         Vector refractado normalizado o None si hay reflexión total interna
     """
-    I = normalize(np.asarray(I, dtype=np.float32))
-    N = normalize(np.asarray(N, dtype=np.float32))
+    I = normalize(I)
+    N = normalize(N)
     
     cosi = -dot(I, N)
     cosi = clamp(cosi, -1.0, 1.0)
@@ -110,4 +122,32 @@ def lerp(a, b, t):
 def smoothstep(edge0, edge1, x):
     """Interpolación suave (Hermite)."""
     t = clamp((x - edge0) / (edge1 - edge0), 0.0, 1.0)
-    return t * t * (3.0 - 2.0 * t)
\ No newline at end of file
+    return t * t * (3.0 - 2.0 * t)
+
+def transform_matrix(position=(0, 0, 0), rotation=(0, 0, 0), scale=1.0):
+    """
+    Matriz 4x4 objeto -> mundo: escala (float o 3 valores), rotación
+    (rx, ry, rz) en grados aplicada en orden X, Y, Z como en load_obj,
+    y traslación.
+    """
+    rx, ry, rz = np.radians(np.asarray(rotation, dtype=np.float64))
+    Rx = np.array([[1, 0, 0], [0, np.cos(rx), -np.sin(rx)], [0, np.sin(rx), np.cos(rx)]])
+    Ry = np.array([[np.cos(ry), 0, np.sin(ry)], [0, 1, 0], [-np.sin(ry), 0, np.cos(ry)]])
+    Rz = np.array([[np.cos(rz), -np.sin(rz), 0], [np.sin(rz), np.cos(rz), 0], [0, 0, 1]])
+
+    M = np.eye(4)
+    M[:3, :3] = Rz @ Ry @ Rx @ np.diag(np.broadcast_to(np.asarray(scale, dtype=np.float64), (3,)))
+    M[:3, 3] = position
+    return M
+
+# Backend escalar del camino por rayo, elegido al importar con
+# RT_MATH_BACKEND=numpy (por defecto) o float (tuplas Vec3, ver vec3.py).
+# scalar expone normalize, dot, cross, length, reflect y refract; las
+# funciones de este módulo siguen siendo siempre las de NumPy.
+BACKEND = os.environ.get("RT_MATH_BACKEND", "numpy").lower()
+if BACKEND == "float":
+    from Textures import vec3 as scalar
+elif BACKEND == "numpy":
+    scalar = sys.modules[__name__]
+else:
+    raise ValueError(f"RT_MATH_BACKEND desconocido: {BACKEND!r} (numpy o float)")
@@ -0,0 +1,109 @@
+"""
+Caché de imágenes del proceso: ImageTexture y EnvMap piden su pirámide
+de mips a load_mipmap, que la busca en este orden:
+
+1. ASSETS, un LRU en memoria compartido por todos los Raytracer del
+   proceso, con clave (ruta, mtime, tamaño, dtype) y un presupuesto en
+   bytes (RT_ASSET_BUDGET_MB, 512 por defecto);
+2. __texcache__/ junto a la imagen: los niveles ya decodificados como
+   .npy, abiertos con mmap (sin pygame ni decodificación);
+3. decodificar la imagen, construir los mips y guardarlos en __texcache__.
+
+Las pirámides abiertas desde __texcache__ se serializan sólo con su ruta,
+así los procesos de render_parallel mapean los mismos archivos y comparten
+una copia física de cada textura.
+"""
+import os
+from collections import OrderedDict
+import numpy as np
+
+from BMP.BMP_Reader import load as load_bmp
+from Textures.mipmap import MipMap
+
+CACHE_DIR = "__texcache__"
+CACHE_VERSION = 1
+
+def load_image(path):
+    """
+    Imagen RGB (H,W,3) float32 en [0,1].
+    Los BMP se decodifican sin pygame (render sin pantalla); otros
+    formatos (png/jpg) todavía lo necesitan.
+    """
+    if os.path.splitext(path)[1].lower() == ".bmp":
+        return load_bmp(path).astype(np.float32) / 255.0
+    import pygame
+    surf = pygame.image.load(path)
+    arr = pygame.surfarray.pixels3d(surf).astype(np.float32) / 255.0
+    # pygame devuelve (W,H,3), convertimos a (H,W,3)
+    return np.transpose(arr, (1, 0, 2)).copy()
+
+class AssetCache:
+    """
+    LRU de assets decodificados con presupuesto en bytes (según su nbytes).
+    Al pasarse del presupuesto descarta los menos usados; el último
+    agregado siempre se queda aunque por sí solo lo exceda.
+    """
+    def __init__(self, budget):
+        self.budget = int(budget)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key, load):
+        """El asset de key; si no está lo crea con load() y lo agrega."""
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+        self.misses += 1
+        value = load()
+        size = int(getattr(value, "nbytes", 0))
+        self._items[key] = (value, size)
+        self.nbytes += size
+        while self.nbytes > self.budget and len(self._items) > 1:
+            _, (_, dropped) = self._items.popitem(last=False)
+            self.nbytes -= dropped
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+ASSETS = AssetCache(float(os.environ.get("RT_ASSET_BUDGET_MB", 512)) * 2**20)
+
+def _cache_path(path, mtime_ns, size, dtype):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    root = os.path.join(os.path.dirname(path), CACHE_DIR)
+    return os.path.join(root, f"{stem}-{mtime_ns:x}-{size:x}-{dtype.name}-v{CACHE_VERSION}")
+
+def _open_mipmap(path, mtime_ns, size, dtype):
+    cache_path = _cache_path(path, mtime_ns, size, dtype)
+    mips = MipMap.from_dir(cache_path)
+    if mips is not None:
+        return mips
+
+    mips = MipMap(load_image(path), dtype)
+    if mips.save(cache_path):
+        # Se reabre con mmap para compartir las páginas con otros procesos
+        return MipMap.from_dir(cache_path) or mips
+    return mips
+
+def load_mipmap(path, dtype=np.uint8, cache=True):
+    """
+    MipMap de la imagen path, pasando por ASSETS y __texcache__.
+    cache=False decodifica siempre y no usa ninguna de las dos.
+    """
+    dtype = np.dtype(dtype)
+    if not cache:
+        return MipMap(load_image(path), dtype)
+
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size, dtype.name)
+    return ASSETS.get(key, lambda: _open_mipmap(path, st.st_mtime_ns, st.st_size, dtype))
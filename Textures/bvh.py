@@ -0,0 +1,265 @@
+import math
+import numpy as np
+
+class BVH:
+    """
+    Jerarquía de volúmenes envolventes (BVH) sobre cajas AABB.
+    - lo, hi: arreglos (N, 3) con la caja de cada primitiva
+    - leaf_size: máximo de primitivas por hoja
+    - bins: número de bins para la heurística SAH
+
+    Los nodos se guardan en arreglos planos; los hijos de un nodo interno
+    están en left y left + 1 (siempre con índice mayor que el padre). Las
+    hojas apuntan a order[start:start+count].
+    """
+    PAD = 1e-4
+
+    def __init__(self, lo, hi, leaf_size=4, bins=12):
+        lo = np.asarray(lo, dtype=np.float64).reshape(-1, 3) - self.PAD
+        hi = np.asarray(hi, dtype=np.float64).reshape(-1, 3) + self.PAD
+        self.leaf_size = int(leaf_size)
+        self.bins = int(bins)
+        self.order = np.arange(len(lo))
+        self.prim_lo, self.prim_hi = lo, hi
+        self._build(lo, hi)
+
+    # Construcción
+    def _build(self, lo, hi):
+        centroids = (lo + hi) * 0.5
+        node_lo, node_hi, left, start, count = [], [], [], [], []
+
+        def new_node(s, c):
+            node_lo.append(None); node_hi.append(None)
+            left.append(-1); start.append(s); count.append(c)
+            return len(left) - 1
+
+        stack = [new_node(0, len(lo))]
+        while stack:
+            node = stack.pop()
+            s, c = start[node], count[node]
+            prims = self.order[s:s + c]
+            node_lo[node] = lo[prims].min(axis=0)
+            node_hi[node] = hi[prims].max(axis=0)
+            if c <= self.leaf_size:
+                continue
+
+            split = self._split(prims, lo, hi, centroids, node_lo[node], node_hi[node])
+            if split is None:
+                continue
+            mask = split
+            n_left = int(mask.sum())
+            self.order[s:s + c] = np.concatenate([prims[mask], prims[~mask]])
+
+            l = new_node(s, n_left)
+            r = new_node(s + n_left, c - n_left)
+            left[node] = l
+            count[node] = 0
+            stack.append(r); stack.append(l)
+
+        self.lo = np.array(node_lo)
+        self.hi = np.array(node_hi)
+        self.left = np.array(left)
+        self.start = np.array(start)
+        self.count = np.array(count)
+
+        # Padre de cada nodo y hoja de cada primitiva (para refit)
+        inner = np.nonzero(self.count == 0)[0]
+        self.parent = np.full(len(left), -1)
+        self.parent[self.left[inner]] = inner
+        self.parent[self.left[inner] + 1] = inner
+        leaves = np.nonzero(self.count > 0)[0]
+        self.leaf_of = np.empty(len(lo), dtype=np.int64)
+        self.leaf_of[self.order[np.concatenate([np.arange(self.start[n], self.start[n] + self.count[n])
+                                                for n in leaves])]] = np.repeat(leaves, self.count[leaves])
+
+        # Copias en listas de Python para el recorrido escalar
+        self._lo = self.lo.tolist()
+        self._hi = self.hi.tolist()
+        self._left = self.left.tolist()
+        self._start = self.start.tolist()
+        self._count = self.count.tolist()
+
+    def _split(self, prims, lo, hi, centroids, box_lo, box_hi):
+        """Partición SAH por bins sobre el eje más largo de los centroides."""
+        c = centroids[prims]
+        c_min = c.min(axis=0)
+        extent = c.max(axis=0) - c_min
+        axis = int(np.argmax(extent))
+        if extent[axis] <= 0.0:
+            return None
+
+        b = ((c[:, axis] - c_min[axis]) / extent[axis] * self.bins).astype(np.int64)
+        b = np.clip(b, 0, self.bins - 1)
+
+        counts = np.bincount(b, minlength=self.bins)
+        b_lo = np.full((self.bins, 3), np.inf)
+        b_hi = np.full((self.bins, 3), -np.inf)
+        np.minimum.at(b_lo, b, lo[prims])
+        np.maximum.at(b_hi, b, hi[prims])
+
+        def area(l, h):
+            d = np.where(np.isfinite(h - l), h - l, 0.0)
+            return 2.0 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
+
+        # Barridos acumulados de izquierda a derecha y viceversa
+        left_lo = np.minimum.accumulate(b_lo); left_hi = np.maximum.accumulate(b_hi)
+        right_lo = np.minimum.accumulate(b_lo[::-1])[::-1]
+        right_hi = np.maximum.accumulate(b_hi[::-1])[::-1]
+        n_left = np.cumsum(counts)[:-1]
+        n_right = len(prims) - n_left
+        cost = area(left_lo[:-1], left_hi[:-1]) * n_left + area(right_lo[1:], right_hi[1:]) * n_right
+        cost = np.where((n_left > 0) & (n_right > 0), cost, np.inf)
+
+        best = int(np.argmin(cost))
+        if not np.isfinite(cost[best]):
+            return None
+        return b <= best
+
+    # Actualización
+    def refit(self, prims, lo, hi):
+        """
+        Reemplaza las cajas de las primitivas prims y ajusta las de sus
+        ancestros sin reconstruir el árbol. Pensado para pocas figuras que
+        se mueven entre cuadros; con desplazamientos grandes el árbol pierde
+        calidad y conviene reconstruirlo.
+        """
+        prims = np.asarray(prims, dtype=np.int64).reshape(-1)
+        self.prim_lo[prims] = np.asarray(lo, dtype=np.float64).reshape(-1, 3) - self.PAD
+        self.prim_hi[prims] = np.asarray(hi, dtype=np.float64).reshape(-1, 3) + self.PAD
+
+        # Los hijos tienen índice mayor que su padre: de mayor a menor,
+        # cada nodo se recalcula después de sus hijos
+        dirty = set(self.leaf_of[prims].tolist())
+        while dirty:
+            node = max(dirty)
+            dirty.remove(node)
+            c = self.count[node]
+            if c > 0:
+                members = self.order[self.start[node]:self.start[node] + c]
+                self.lo[node] = self.prim_lo[members].min(axis=0)
+                self.hi[node] = self.prim_hi[members].max(axis=0)
+            else:
+                l = self.left[node]
+                self.lo[node] = np.minimum(self.lo[l], self.lo[l + 1])
+                self.hi[node] = np.maximum(self.hi[l], self.hi[l + 1])
+            self._lo[node] = self.lo[node].tolist()
+            self._hi[node] = self.hi[node].tolist()
+            if node > 0:
+                dirty.add(int(self.parent[node]))
+
+    # Recorrido escalar
+    def _ray(self, orig, direction):
+        o = [float(x) for x in orig]
+        inv = [1.0 / float(d) if d != 0 else math.copysign(1e30, float(d) or 1.0)
+               for d in direction]
+        return o, inv
+
+    def _enter(self, node, o, inv, t_lim):
+        """Distancia de entrada a la caja del nodo, o None si el rayo no la cruza antes de t_lim."""
+        l, h = self._lo[node], self._hi[node]
+        t0 = 0.0; t1 = t_lim
+        for a in range(3):
+            ta = (l[a] - o[a]) * inv[a]
+            tb = (h[a] - o[a]) * inv[a]
+            if ta > tb:
+                ta, tb = tb, ta
+            if ta > t0: t0 = ta
+            if tb < t1: t1 = tb
+            if t0 > t1:
+                return None
+        return t0
+
+    def closest_hit(self, orig, direction, test_leaf, t_max=np.inf):
+        """
+        Recorre el árbol de cerca a lejos.
+        test_leaf(prims, t_max) -> (t, payload) o None, sólo si t < t_max.
+        Retorna el payload más cercano o None.
+        """
+        o, inv = self._ray(orig, direction)
+        enter = self._enter
+        left, start, count = self._left, self._start, self._count
+
+        best = None
+        if enter(0, o, inv, t_max) is None:
+            return None
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            c = count[node]
+            if c > 0:
+                res = test_leaf(self.order[start[node]:start[node] + c], t_max)
+                if res is not None:
+                    t_max, best = res
+                continue
+
+            l = left[node]; r = l + 1
+            tl = enter(l, o, inv, t_max); tr = enter(r, o, inv, t_max)
+            if tl is not None and tr is not None:
+                # El hijo más cercano se procesa primero
+                if tl <= tr:
+                    stack.append(r); stack.append(l)
+                else:
+                    stack.append(l); stack.append(r)
+            elif tl is not None:
+                stack.append(l)
+            elif tr is not None:
+                stack.append(r)
+        return best
+
+    def any_hit(self, orig, direction, test_leaf, t_max=np.inf):
+        """
+        Como closest_hit pero termina en la primera hoja que reporta impacto.
+        test_leaf(prims) -> bool. Retorna True si alguna hoja pegó.
+        """
+        o, inv = self._ray(orig, direction)
+        enter = self._enter
+        left, start, count = self._left, self._start, self._count
+
+        if enter(0, o, inv, t_max) is None:
+            return False
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            c = count[node]
+            if c > 0:
+                if test_leaf(self.order[start[node]:start[node] + c]):
+                    return True
+                continue
+
+            l = left[node]
+            if enter(l + 1, o, inv, t_max) is not None:
+                stack.append(l + 1)
+            if enter(l, o, inv, t_max) is not None:
+                stack.append(l)
+        return False
+
+    # Recorrido por paquetes
+    def traverse_many(self, origins, directions, t_limit, test_leaf):
+        """
+        Recorrido por lotes. t_limit: arreglo (N,) que test_leaf puede
+        reducir en sitio para podar nodos más lejanos.
+        test_leaf(prims, rays) recibe los índices de rayos que llegan a la hoja.
+        """
+        with np.errstate(divide='ignore'):
+            inv = 1.0 / np.where(np.abs(directions) < 1e-12, 1e-12, directions)
+
+        stack = [(0, np.arange(len(directions)))]
+        while stack:
+            node, rays = stack.pop()
+            o = origins[rays]; iv = inv[rays]
+            ta = (self.lo[node] - o) * iv
+            tb = (self.hi[node] - o) * iv
+            t0 = np.maximum(np.max(np.minimum(ta, tb), axis=1), 0.0)
+            t1 = np.min(np.maximum(ta, tb), axis=1)
+            rays = rays[(t0 <= t1) & (t0 <= t_limit[rays])]
+            if len(rays) == 0:
+                continue
+
+            c = self.count[node]
+            if c > 0:
+                s = self.start[node]
+                test_leaf(self.order[s:s + c], rays)
+            else:
+                l = self.left[node]
+                stack.append((l + 1, rays))
+                stack.append((l, rays))
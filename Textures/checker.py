@@ -15,3 +15,11 @@ class CheckerTexture:
         iv = int(vv * self.tv)
         is_a = ((iu + iv) & 1) == 0
         return self.ca if is_a else self.cb
+
+    def sample_many(self, uv):
+        """Colores (N,3) para coordenadas uv (N,2): el mismo patrón que sample, sin bucle."""
+        uv = np.asarray(uv, dtype=np.float64) % 1.0
+        iu = (uv[:, 0] * self.tu).astype(np.int64)
+        iv = (uv[:, 1] * self.tv).astype(np.int64)
+        is_a = ((iu + iv) & 1) == 0
+        return np.where(is_a[:, None], self.ca, self.cb)
@@ -0,0 +1,11 @@
+import numpy as np
+
+def hexc(h):
+    """Color '#RRGGBB' -> tupla RGB en [0,1]."""
+    h = h.lstrip('#')
+    return tuple(int(h[i:i+2], 16)/255.0 for i in (0, 2, 4))
+
+def tone_map(img: np.ndarray, gamma: float = 2.2) -> np.ndarray:
+    """Recorta a [0,1] y aplica la corrección gamma para mostrar o guardar."""
+    img = np.clip(img, 0.0, 1.0)
+    return np.power(img, 1.0 / gamma)
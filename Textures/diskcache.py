@@ -0,0 +1,28 @@
+"""
+Escritura de las cachés en disco (__meshcache__ de obj_loader y
+__texcache__ de assets): un directorio por entrada con un .npy por arreglo.
+"""
+import os
+import shutil
+import numpy as np
+
+def write_arrays(path, arrays):
+    """
+    Guarda arrays (nombre -> arreglo) como <nombre>.npy en el directorio
+    path, creando los directorios padre. Se escribe en un directorio
+    temporal y se renombra: un lector nunca ve una entrada a medias. Un
+    error de escritura no se propaga (la caché es opcional). Retorna True
+    si path existe al terminar (escrito por este u otro proceso).
+    """
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + ".npy"), array)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        # Sin permiso de escritura, CACHE_DIR no es un directorio u otro
+        # proceso ya la creó
+        shutil.rmtree(tmp, ignore_errors=True)
+        return os.path.isdir(path)
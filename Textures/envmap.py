@@ -1,17 +1,55 @@
 import numpy as np
-import pygame
+
+from Textures.assets import load_mipmap
+
+def _sign(x):
+    return np.where(x >= 0.0, 1.0, -1.0)
+
+def octahedral_encode(d):
+    """Direcciones (N,3) -> coordenadas (N,2) en [0,1] del mapa octaédrico, sin trigonometría."""
+    p = d / np.maximum(np.abs(d).sum(axis=1, keepdims=True), 1e-12)
+    x, y, z = p[:, 0], p[:, 2], p[:, 1]
+    lower = z < 0.0
+    x, y = (np.where(lower, (1.0 - np.abs(y)) * _sign(x), x),
+            np.where(lower, (1.0 - np.abs(x)) * _sign(y), y))
+    return np.stack([x, y], axis=1) * 0.5 + 0.5
+
+def octahedral_decode(uv):
+    """Inversa de octahedral_encode: coordenadas (N,2) en [0,1] -> direcciones (N,3) normalizadas."""
+    f = uv * 2.0 - 1.0
+    x, y = f[:, 0], f[:, 1]
+    z = 1.0 - np.abs(x) - np.abs(y)
+    lower = z < 0.0
+    x, y = (np.where(lower, (1.0 - np.abs(y)) * _sign(x), x),
+            np.where(lower, (1.0 - np.abs(x)) * _sign(y), y))
+    d = np.stack([x, z, y], axis=1)
+    return d / np.linalg.norm(d, axis=1, keepdims=True)
 
 class EnvMap:
     """
     Env map equirectangular (lat-long).
-    Espera una imagen 8-bit RGB (png/jpg/bmp). Usa sample(direction)
-    para obtener un color en [0,1].
+    Espera una imagen 8-bit RGB (png/jpg/bmp), guardada como pirámide de
+    mips (MipMap, uint8 por defecto). Usa sample(direction) para obtener
+    un color en [0,1], o sample_many(directions) para un arreglo (N,3) de
+    direcciones; lod elige el nivel (lod_for lo calcula a partir del
+    ángulo que cubre cada rayo). Con cache=True la pirámide sale de la
+    caché de assets (assets.py).
+    build_lut(size) precalcula un mapa octaédrico size x size; desde ahí
+    sample y sample_many no usan arctan2/arccos ni filtro bilineal: cada
+    dirección lee un solo texel (el hemisferio +Y queda en el rombo central
+    del mapa y el -Y en las esquinas). Con size de unas dos veces el ancho
+    del env map el error frente al muestreo exacto es de ~1e-3.
+    Con lod > 0 se usa una LUT por nivel de mip (size >> k, mínimo 16),
+    construida la primera vez que se pide ese nivel, y se mezclan las dos
+    que rodean lod como en el trilineal.
     """
-    def __init__(self, path: str):
-        surf = pygame.image.load(path)        
-        arr  = pygame.surfarray.pixels3d(surf).astype(np.float32) / 255.0
-        self.img = np.transpose(arr, (1, 0, 2)).copy()
-        self.h, self.w = self.img.shape[:2]
+    def __init__(self, path: str, lut_size=None, dtype=np.uint8, cache=True):
+        self.mips = load_mipmap(path, dtype, cache)
+        self.h, self.w = self.mips.h, self.mips.w
+        self.lut = None
+        self.luts = {}
+        if lut_size:
+            self.build_lut(lut_size)
 
     def _bilinear(self, u: float, v: float):
         u = u % 1.0
@@ -24,19 +62,27 @@ class EnvMap:
 
         sx = x - x0; sy = y - y0
 
-        c00 = self.img[y0, x0]; c10 = self.img[y0, x1]
-        c01 = self.img[y1, x0]; c11 = self.img[y1, x1]
+        img = self.mips.levels[0]; load = self.mips.load
+        c00 = load(img[y0, x0]); c10 = load(img[y0, x1])
+        c01 = load(img[y1, x0]); c11 = load(img[y1, x1])
         c0  = c00 * (1 - sx) + c10 * sx
         c1  = c01 * (1 - sx) + c11 * sx
         return c0 * (1 - sy) + c1 * sy
 
-    def sample(self, direction):
+    def lod_for(self, angle):
+        """Nivel de detalle para rayos que cubren angle radianes (en el ecuador del mapa)."""
+        return self.mips.lod(np.asarray(angle) * self.w / (2.0 * np.pi))
+
+    def sample(self, direction, lod=0.0):
         """
         direction: np.array([x,y,z]) normalizado.
         Mapeo equirectangular:
            u = atan2(z, x) / (2π) + 0.5
            v = acos(y) / π
         """
+        if self.lut is not None or lod > 0.0:
+            return self.sample_many(np.asarray(direction, dtype=np.float64)[None, :], lod)[0]
+
         d = direction / (np.linalg.norm(direction) + 1e-12)
         x, y, z = float(d[0]), float(d[1]), float(d[2])
 
@@ -46,3 +92,60 @@ class EnvMap:
         u = (theta / (2.0 * np.pi)) + 0.5         # [0,1]
         v =  phi / np.pi                          # [0,1]
         return self._bilinear(u, v)
+
+    def sample_equirect(self, directions, lod=0.0):
+        """sample sobre un arreglo (N,3): el mismo mapeo equirectangular, trilineal sobre los mips."""
+        d = directions / (np.linalg.norm(directions, axis=1, keepdims=True) + 1e-12)
+        u = (np.arctan2(d[:, 2], d[:, 0]) / (2.0 * np.pi) + 0.5) % 1.0
+        v = (np.arccos(np.clip(d[:, 1], -1.0, 1.0)) / np.pi) % 1.0
+        return self.mips.sample(u, v, lod)
+
+    def sample_many(self, directions, lod=0.0):
+        """
+        Colores (N,3) para direcciones (N,3). Con LUT y lod numérico usa
+        las LUT octaédricas de los niveles que rodean lod; sin LUT, o con
+        lod por rayo (arreglo (N,)), lee los mips.
+        """
+        directions = np.asarray(directions, dtype=np.float64)
+        lod = np.asarray(lod, dtype=np.float64)
+        if lod.ndim > 0 and not np.any(lod > 0.0):
+            lod = np.float64(0.0)
+        if self.lut is None or lod.ndim > 0:
+            return self.sample_equirect(directions, lod)
+
+        lod = min(max(float(lod), 0.0), len(self.mips.levels) - 1)
+        k = int(lod)
+        frac = lod - k
+        uv = octahedral_encode(directions)
+        color = self._lookup(k, uv)
+        if frac > 0.0:
+            color += (self._lookup(k + 1, uv) - color) * np.float32(frac)
+        return color
+
+    def _lookup(self, k, uv):
+        """Un texel de la LUT del nivel k por coordenada octaédrica (N,2)."""
+        lut = self.luts.get(k)
+        if lut is None:
+            lut = self.luts[k] = self._build(k, max(16, self.lut.shape[0] >> k))
+        size = lut.shape[0]
+        xy = (uv * size).astype(np.int64)
+        np.clip(xy, 0, size - 1, out=xy)
+        return lut.reshape(-1, 3).take(xy[:, 1] * size + xy[:, 0], axis=0)
+
+    def _build(self, k, size):
+        """LUT octaédrica (size, size, 3) float32 del nivel k, muestreada en el centro de cada texel."""
+        jj, ii = np.mgrid[0:size, 0:size]
+        uv = (np.stack([ii.ravel(), jj.ravel()], axis=1) + 0.5) / size
+        colors = self.sample_equirect(octahedral_decode(uv), k)
+        return colors.reshape(size, size, 3).astype(np.float32)
+
+    def build_lut(self, size=1024):
+        """
+        Precalcula la LUT octaédrica (size, size, 3) float32 del nivel 0;
+        las de los demás niveles se construyen al pedirlas. size=None las quita.
+        """
+        self.luts = {}
+        if not size:
+            self.lut = None
+            return
+        self.lut = self.luts[0] = self._build(0, size)
@@ -1,32 +1,154 @@
+import math
 import numpy as np
-from Textures.MathLib import normalize
+from Textures.MathLib import normalize, normalize_many, dot_many, transform_matrix
+from Textures.MathLib import scalar as vec
 from Textures.intercept import Intercept
 from Textures.material import Material
+from Textures.bvh import BVH
+from Textures.quartic import first_root, first_root_many
 
 EPS = 1e-6
 
+def _spherical_uv(n):
+    """UV esférico a partir de una dirección unitaria (3,) o (N, 3)."""
+    u = np.arctan2(n[..., 2], n[..., 0]) / (2.0 * np.pi) + 0.5
+    v = 1.0 - np.arccos(np.clip(n[..., 1], -1.0, 1.0)) / np.pi
+    return u, v
+
+def _moller_trumbore(o, d, v0, e1, e2):
+    """
+    Möller–Trumbore con broadcasting sobre rayos y triángulos.
+    Retorna (t, u, v); t = inf donde no hay impacto.
+    """
+    h = np.cross(d, e2)
+    a = np.sum(e1 * h, axis=-1)
+    ok = np.abs(a) >= EPS
+    f = 1.0 / np.where(ok, a, 1.0)
+
+    s = o - v0
+    u = f * np.sum(s * h, axis=-1)
+    q = np.cross(s, e1)
+    v = f * np.sum(d * q, axis=-1)
+    t = f * np.sum(e2 * q, axis=-1)
+
+    ok &= (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t >= EPS)
+    return np.where(ok, t, np.inf), u, v
+
+def _barycentric(corners, u, v):
+    """Interpola valores por esquina (..., 3, k) con las baricéntricas (u, v) de Möller–Trumbore."""
+    u = np.asarray(u)[..., None]
+    v = np.asarray(v)[..., None]
+    return (1.0 - u - v) * corners[..., 0, :] + u * corners[..., 1, :] + v * corners[..., 2, :]
+
 # Base
 class Shape:
+    """
+    Figura base. Cada subclase declara __slots__ y precalcula en __init__
+    las constantes que no dependen del rayo. freeze() la vuelve inmutable
+    (atributos y arreglos de sólo lectura) una vez construida la escena.
+    """
+    __slots__ = ("position", "material", "type", "_frozen")
+
     def __init__(self, position, material: Material):
+        self._frozen = False
         self.position = np.array(position, dtype=np.float32) if position is not None else None
         self.material = material
         self.type = "Shape"
 
-    def ray_intersect(self, orig, dir):
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{self.type} está congelada; no se puede cambiar '{name}'")
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def _slot_names(cls):
+        return [n for c in reversed(cls.__mro__) for n in c.__dict__.get("__slots__", ())]
+
+    def freeze(self):
+        """Marca la figura y sus arreglos como de sólo lectura."""
+        for name in self._slot_names():
+            value = getattr(self, name, None)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def __getstate__(self):
+        return {n: getattr(self, n) for n in self._slot_names() if hasattr(self, n)}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        if state.get("_frozen"):
+            self.freeze()
+
+    # Intersección en dos fases: hit() durante el recorrido, surface() sólo
+    # para la figura ganadora
+    def hit(self, orig, dir):
+        """
+        Impacto más cercano como (t, payload) o None. El payload es un dato
+        pequeño y local a la figura (p. ej. baricéntricas) que surface() usa
+        para completar el impacto; no se construye ningún Intercept.
+        """
+        raise NotImplementedError
+
+    def surface(self, orig, dir, t, payload):
+        """Construye el Intercept (punto, normal, UV) del impacto dado por hit()."""
         raise NotImplementedError
 
+    def ray_intersect(self, orig, dir):
+        h = self.hit(orig, dir)
+        return None if h is None else self.surface(orig, dir, *h)
+
+    def hit_distance(self, orig, dir):
+        """Sólo la distancia al impacto más cercano (o None); la usan los rayos de sombra."""
+        h = self.hit(orig, dir)
+        return None if h is None else h[0]
+
+    def bounds(self):
+        """Caja envolvente (lo, hi). Infinita si la figura no es acotada."""
+        return (np.full(3, -np.inf), np.full(3, np.inf))
+
+    def intersect_many(self, origins, directions):
+        """
+        Intersección de N rayos a la vez.
+        origins, directions: arreglos (N, 3)
+        Retorna (t, normals, uvs) con formas (N,), (N, 3), (N, 2);
+        t = inf donde el rayo no pega.
+        Implementación genérica: recorre los rayos con ray_intersect.
+        """
+        n = len(directions)
+        t = np.full(n, np.inf)
+        normals = np.zeros((n, 3))
+        uvs = np.zeros((n, 2))
+        for k in range(n):
+            hit = self.ray_intersect(origins[k], directions[k])
+            if hit is None:
+                continue
+            t[k] = hit.distance
+            normals[k] = hit.normal
+            if hit.texcoords is not None:
+                uvs[k] = hit.texcoords
+        return t, normals, uvs
+
 # Esfera 
 class Sphere(Shape):
+    __slots__ = ("radius", "r2")
+
     def __init__(self, position, radius, material):
         super().__init__(position, material)
         self.radius = float(radius)
+        self.r2 = self.radius * self.radius
         self.type = "Sphere"
 
-    def ray_intersect(self, orig, dir):
+    def bounds(self):
+        return (self.position - self.radius, self.position + self.radius)
+
+    def hit(self, orig, dir):
         L = self.position - orig
         tca = np.dot(L, dir)
         d2 = np.dot(L, L) - tca * tca
-        r2 = self.radius * self.radius
+        r2 = self.r2
         
         if d2 > r2:
             return None
@@ -38,20 +160,57 @@ class Sphere(Shape):
         t = t0 if t0 > EPS else t1
         if t < EPS:
             return None
+        return t, None
 
+    def surface(self, orig, dir, t, payload):
         hit = orig + dir * t
-        normal = normalize(hit - self.position)
+        normal = vec.normalize(hit - self.position)
+        u, v = _spherical_uv(np.asarray(normal))
         
-        return Intercept(point=hit, normal=normal, distance=t, obj=self)
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        L = self.position - origins
+        tca = dot_many(L, directions)
+        d2 = dot_many(L, L) - tca * tca
+        r2 = self.r2
+
+        thc = np.sqrt(np.maximum(r2 - d2, 0.0))
+        t0 = tca - thc
+        t1 = tca + thc
+        t = np.where(t0 > EPS, t0, t1)
+        ok = (d2 <= r2) & (t >= EPS)
+        t = np.where(ok, t, np.inf)
+
+        normals = np.zeros((len(t), 3))
+        uvs = np.zeros((len(t), 2))
+        hit = origins[ok] + directions[ok] * t[ok, None]
+        normals[ok] = normalize_many(hit - self.position)
+        uvs[ok, 0], uvs[ok, 1] = _spherical_uv(normals[ok])
+        return t, normals, uvs
 
 # Plano
 class Plane(Shape):
-    def __init__(self, position, normal, material):
+    __slots__ = ("normal", "tangent", "bitangent", "uv_size")
+
+    def __init__(self, position, normal, material, uv_size=4.0):
         super().__init__(position, material)
         self.normal = normalize(np.array(normal, dtype=np.float32))
         self.type = "Plane"
 
-    def ray_intersect(self, orig, dir):
+        # Base tangente para UV planar (una repetición cada uv_size unidades)
+        ref = np.array([1, 0, 0] if abs(self.normal[0]) < 0.9 else [0, 1, 0], dtype=np.float32)
+        self.tangent = normalize(np.cross(ref, self.normal))
+        self.bitangent = normalize(np.cross(self.normal, self.tangent))
+        self.uv_size = float(uv_size)
+
+    def _uv(self, hit):
+        local = hit - self.position
+        return (np.dot(local, self.tangent) / self.uv_size,
+                np.dot(local, self.bitangent) / self.uv_size)
+
+    def hit(self, orig, dir):
         denom = np.dot(dir, self.normal)
         if abs(denom) < EPS:
             return None
@@ -59,44 +218,86 @@ class Plane(Shape):
         t = np.dot(self.position - orig, self.normal) / denom
         if t < EPS:
             return None
-            
+        return t, None
+
+    def surface(self, orig, dir, t, payload):
         hit = orig + dir * t
-        return Intercept(point=hit, normal=self.normal, distance=t, obj=self)
+        u, v = self._uv(hit)
+        return Intercept(point=hit, normal=self.normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        denom = dot_many(directions, self.normal)
+        ok = np.abs(denom) >= EPS
+        safe = np.where(ok, denom, 1.0)
+        t = dot_many(self.position - origins, self.normal) / safe
+        ok &= t >= EPS
+        t = np.where(ok, t, np.inf)
+        normals = np.broadcast_to(self.normal.astype(np.float64), (len(t), 3)).copy()
+        uvs = np.zeros((len(t), 2))
+        hit = origins[ok] + directions[ok] * t[ok, None]
+        uvs[ok, 0], uvs[ok, 1] = self._uv(hit)
+        return t, normals, uvs
 
 # Disco
 class Disk(Plane):
+    __slots__ = ("radius", "r2")
+
     def __init__(self, position, normal, radius, material):
         super().__init__(position, normal, material)
         self.radius = float(radius)
+        self.r2 = self.radius * self.radius
         self.type = "Disk"
 
-    def ray_intersect(self, orig, dir):
-        plane_hit = super().ray_intersect(orig, dir)
-        if plane_hit is None:
+    def bounds(self):
+        # Extensión del disco en cada eje: r * sqrt(1 - n_i²)
+        ext = self.radius * np.sqrt(np.maximum(0.0, 1.0 - self.normal * self.normal))
+        return (self.position - ext, self.position + ext)
+
+    def hit(self, orig, dir):
+        # surface se hereda de Plane
+        h = super().hit(orig, dir)
+        if h is None:
             return None
             
-        v = plane_hit.point - self.position
-        if np.dot(v, v) <= self.radius * self.radius:
-            return plane_hit
+        v = orig + dir * h[0] - self.position
+        if np.dot(v, v) <= self.r2:
+            return h
         return None
 
+    def intersect_many(self, origins, directions):
+        t, normals, uvs = super().intersect_many(origins, directions)
+        ok = np.isfinite(t)
+        v = origins[ok] + directions[ok] * t[ok, None] - self.position
+        inside = np.zeros(len(t), dtype=bool)
+        inside[ok] = dot_many(v, v) <= self.r2
+        t = np.where(inside, t, np.inf)
+        return t, normals, uvs
+
 #  Triángulo
 class Triangle(Shape):
+    __slots__ = ("A", "B", "C", "edge1", "edge2", "normal")
+
     def __init__(self, A, B, C, material):
         super().__init__(A, material)
         self.A = np.array(A, dtype=np.float32)
         self.B = np.array(B, dtype=np.float32)
         self.C = np.array(C, dtype=np.float32)
         
-        # Calcular normal
-        edge1 = self.B - self.A
-        edge2 = self.C - self.A
-        self.normal = normalize(np.cross(edge1, edge2))
+        # Aristas y normal precalculadas
+        self.edge1 = self.B - self.A
+        self.edge2 = self.C - self.A
+        self.normal = normalize(np.cross(self.edge1, self.edge2))
         self.type = "Triangle"
 
-    def ray_intersect(self, orig, dir):
-        edge1 = self.B - self.A
-        edge2 = self.C - self.A
+    def bounds(self):
+        pts = np.stack([self.A, self.B, self.C])
+        return (pts.min(axis=0), pts.max(axis=0))
+
+    def hit(self, orig, dir):
+        # Möller–Trumbore escalar; payload: baricéntricas (u, v)
+        edge1 = self.edge1
+        edge2 = self.edge2
         
         h = np.cross(dir, edge2)
         a = np.dot(edge1, h)
@@ -121,19 +322,139 @@ class Triangle(Shape):
         
         if t < EPS:
             return None
-            
+        return t, (u, v)
+
+    def surface(self, orig, dir, t, payload):
+        u, v = payload
         hit = orig + dir * t
-        return Intercept(point=hit, normal=self.normal, distance=t, obj=self)
+        return Intercept(point=hit, normal=self.normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        t, u, v = _moller_trumbore(origins, directions, self.A, self.edge1, self.edge2)
+        normals = np.broadcast_to(self.normal.astype(np.float64), (len(t), 3)).copy()
+        uvs = np.where(np.isfinite(t)[:, None], np.stack([u, v], axis=1), 0.0)
+        return t, normals, uvs
+
+# Malla de triángulos empaquetada
+class TriangleMesh(Shape):
+    """
+    Malla de triángulos en arreglos contiguos:
+    - vertices: (V, 3) float32
+    - faces:    (F, 3) int32
+    - normals:  (F, 3, 3) float32 normales por esquina (opcional)
+    - uvs:      (F, 3, 2) float32 UV por esquina (opcional)
+    Las aristas y normales por cara se precalculan; la intersección
+    recorre un BVH interno y prueba cada hoja con Möller–Trumbore vectorizado.
+    Con normals la normal del impacto se interpola con las baricéntricas
+    (sombreado suave); sin ellas se usa la normal de la cara. Con uvs las
+    texcoords son las UV interpoladas; sin ellas, las baricéntricas (u, v).
+    """
+    __slots__ = ("vertices", "faces", "normals", "uvs", "v0", "edge1", "edge2", "face_normals", "bvh", "box", "t_min")
+
+    def __init__(self, vertices, faces, material, leaf_size=8, normals=None, uvs=None):
+        super().__init__(None, material)
+        # Copias propias: freeze() no debe volver de sólo lectura los
+        # arreglos del llamador (p. ej. los vértices compartidos del loader)
+        self.vertices = np.array(vertices, dtype=np.float32, order="C")
+        self.faces = np.array(faces, dtype=np.int32, order="C")
+        self.normals = None if normals is None else np.array(normals, dtype=np.float32, order="C")
+        self.uvs = None if uvs is None else np.array(uvs, dtype=np.float32, order="C")
+        self.type = "TriangleMesh"
+
+        self.v0 = self.vertices[self.faces[:, 0]]
+        self.edge1 = self.vertices[self.faces[:, 1]] - self.v0
+        self.edge2 = self.vertices[self.faces[:, 2]] - self.v0
+        n = np.cross(self.edge1, self.edge2)
+        self.face_normals = (n / np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+        tris = self.vertices[self.faces]
+        self.bvh = BVH(tris.min(axis=1), tris.max(axis=1), leaf_size=leaf_size)
+        # Caja de los vértices que usan las caras: el loader comparte el
+        # arreglo de vértices de todo el modelo entre las mallas por material
+        self.box = (tris.min(axis=(0, 1)), tris.max(axis=(0, 1)))
+
+        # Impactos más cercanos que esto se ignoran (umbral de auto-intersección
+        # del Raytracer), para que una cara rechazada no tape a otra más lejana
+        self.t_min = 1e-4
+
+    def bounds(self):
+        return self.box
+
+    def hit(self, orig, dir):
+        # Cara más cercana recorriendo el BVH; payload: (face, u, v)
+        orig = np.asarray(orig, dtype=np.float64)
+        dir = np.asarray(dir, dtype=np.float64)
+
+        def test_leaf(prims, t_max):
+            t, u, v = _moller_trumbore(orig, dir, self.v0[prims], self.edge1[prims], self.edge2[prims])
+            t = np.where(t > self.t_min, t, np.inf)
+            k = int(np.argmin(t))
+            if t[k] < t_max:
+                tk = float(t[k])
+                return (tk, (tk, (int(prims[k]), float(u[k]), float(v[k]))))
+            return None
+
+        return self.bvh.closest_hit(orig, dir, test_leaf)
+
+    def surface(self, orig, dir, t, payload):
+        face, u, v = payload
+        hit = np.asarray(orig, dtype=np.float64) + np.asarray(dir, dtype=np.float64) * t
+        normal = self.face_normals[face] if self.normals is None else normalize(_barycentric(self.normals[face], u, v))
+        if self.uvs is not None:
+            uv = _barycentric(self.uvs[face], u, v)
+            u, v = float(uv[0]), float(uv[1])
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(u, v), obj=self)
+
+    def intersect_many(self, origins, directions):
+        n = len(directions)
+        t_best = np.full(n, np.inf)
+        face = np.full(n, -1, dtype=np.int64)
+        uvs = np.zeros((n, 2))
+
+        def test_leaf(prims, rays):
+            t, u, v = _moller_trumbore(origins[rays, None, :], directions[rays, None, :],
+                                       self.v0[prims], self.edge1[prims], self.edge2[prims])
+            t = np.where(t > self.t_min, t, np.inf)
+            k = np.argmin(t, axis=1)
+            r = np.arange(len(rays))
+            t_k = t[r, k]
+            closer = t_k < t_best[rays]
+            sel = rays[closer]
+            t_best[sel] = t_k[closer]
+            face[sel] = prims[k[closer]]
+            uvs[sel, 0] = u[r, k][closer]
+            uvs[sel, 1] = v[r, k][closer]
+
+        self.bvh.traverse_many(origins, directions, t_best, test_leaf)
+        normals = np.zeros((n, 3))
+        hit = face >= 0
+        f = face[hit]
+        if self.normals is None:
+            normals[hit] = self.face_normals[f]
+        else:
+            normals[hit] = normalize_many(_barycentric(self.normals[f], uvs[hit, 0], uvs[hit, 1]))
+        if self.uvs is not None:
+            uvs[hit] = _barycentric(self.uvs[f], uvs[hit, 0], uvs[hit, 1])
+        return t_best, normals, uvs
 
 # AABB (Cubo)
 class Cube(Shape):
+    __slots__ = ("min", "max", "center", "half_size")
+
     def __init__(self, min_point, max_point, material):
         super().__init__(min_point, material)
         self.min = np.array(min_point, dtype=np.float32)
         self.max = np.array(max_point, dtype=np.float32)
+        self.center = (self.min + self.max) * 0.5
+        self.half_size = (self.max - self.min) * 0.5
         self.type = "Cube"
 
-    def ray_intersect(self, orig, dir):
+    def bounds(self):
+        return (self.min.copy(), self.max.copy())
+
+    def hit(self, orig, dir):
         # Algoritmo de intersección AABB optimizado
         inv_dir = 1.0 / (dir + EPS * np.sign(dir))
         
@@ -152,13 +473,14 @@ class Cube(Shape):
         t = t_near if t_near > EPS else t_far
         if t < EPS:
             return None
-            
+        return t, None
+
+    def surface(self, orig, dir, t, payload):
         hit = orig + dir * t
         
         # Calcular normal basada en la cara impactada
-        center = (self.min + self.max) * 0.5
-        local_hit = hit - center
-        half_size = (self.max - self.min) * 0.5
+        local_hit = hit - self.center
+        half_size = self.half_size
         
         # Encontrar la componente con mayor valor absoluto normalizado
         normalized = local_hit / (half_size + EPS)
@@ -167,111 +489,184 @@ class Cube(Shape):
         
         normal = np.zeros(3, dtype=np.float32)
         normal[max_idx] = np.sign(normalized[max_idx])
+
+        # UV de la cara: los otros dos ejes llevados a [0, 1]
+        a1, a2 = (max_idx + 1) % 3, (max_idx + 2) % 3
+        u = normalized[a1] * 0.5 + 0.5
+        v = normalized[a2] * 0.5 + 0.5
         
-        return Intercept(point=hit, normal=normal, distance=t, obj=self)
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_dir = 1.0 / (directions + EPS * np.sign(directions))
+            t_min = (self.min - origins) * inv_dir
+            t_max = (self.max - origins) * inv_dir
+
+        t_near = np.max(np.minimum(t_min, t_max), axis=1)
+        t_far = np.min(np.maximum(t_min, t_max), axis=1)
+
+        t = np.where(t_near > EPS, t_near, t_far)
+        ok = (t_near <= t_far) & (t_far >= EPS) & (t >= EPS)
+        t = np.where(ok, t, np.inf)
+
+        n = len(t)
+        normals = np.zeros((n, 3))
+        uvs = np.zeros((n, 2))
+        rows = np.nonzero(ok)[0]
+        hit = origins[ok] + directions[ok] * t[ok, None]
+        normalized = (hit - self.center) / (self.half_size + EPS)
+        max_idx = np.argmax(np.abs(normalized), axis=1)
+        k = np.arange(len(rows))
+        normals[rows, max_idx] = np.sign(normalized[k, max_idx])
+        uvs[rows, 0] = normalized[k, (max_idx + 1) % 3] * 0.5 + 0.5
+        uvs[rows, 1] = normalized[k, (max_idx + 2) % 3] * 0.5 + 0.5
+        return t, normals, uvs
 
 # Cilindro (con UV)
 class Cylinder(Shape):
+    __slots__ = ("radius", "height", "r2", "y_min", "y_max", "diameter")
+
     def __init__(self, position, radius, height, material):
         super().__init__(position, material)
         self.radius = float(radius)
         self.height = float(height)
+        self.r2 = self.radius * self.radius
+        self.y_min = -self.height * 0.5
+        self.y_max = self.height * 0.5
+        self.diameter = 2.0 * self.radius
         self.type = "Cylinder"
 
-    def ray_intersect(self, orig, dir):
+    def bounds(self):
+        ext = np.array([self.radius, self.height * 0.5, self.radius], dtype=np.float32)
+        return (self.position - ext, self.position + ext)
+
+    def hit(self, orig, dir):
+        # payload ny: 0 en la superficie lateral, +1 / -1 en la tapa superior / inferior
         # Transformar a espacio local del cilindro
-        local_orig = orig - self.position
-        
-        # Componentes del rayo en el plano XZ
-        ox, oy, oz = local_orig
+        ox, oy, oz = orig - self.position
         dx, dy, dz = dir
         
         # Cilindro infinito en Y
         a = dx * dx + dz * dz
         b = 2.0 * (ox * dx + oz * dz)
-        c = ox * ox + oz * oz - self.radius * self.radius
+        c = ox * ox + oz * oz - self.r2
         
-        y_min = -self.height * 0.5
-        y_max = self.height * 0.5
-        
-        t_side = None
-        normal_side = None
-        texcoords = None
+        best = None
         
         # Intersección con la superficie lateral
         if abs(a) > EPS:
             disc = b * b - 4 * a * c
             if disc >= 0:
                 sqrt_disc = np.sqrt(disc)
-                t0 = (-b - sqrt_disc) / (2 * a)
-                t1 = (-b + sqrt_disc) / (2 * a)
-                
-                for t_candidate in [t0, t1]:
-                    if t_candidate > EPS:
-                        y_hit = oy + dy * t_candidate
-                        if y_min <= y_hit <= y_max:
-                            t_side = t_candidate
-                            
-                            # Normal lateral (perpendicular al eje Y)
-                            hit_local = local_orig + dir * t_side
-                            normal_local = np.array([hit_local[0], 0.0, hit_local[2]], dtype=np.float32)
-                            normal_side = normalize(normal_local)
-                            
-                            # UV mapping lateral
-                            theta = np.arctan2(hit_local[2], hit_local[0])
-                            u = (theta / (2.0 * np.pi)) + 0.5
-                            v = (y_hit - y_min) / self.height
-                            texcoords = (float(u), float(v))
-                            break
-        
-        # Intersección con las tapas
-        t_cap = None
-        normal_cap = None
+                for t in ((-b - sqrt_disc) / (2 * a), (-b + sqrt_disc) / (2 * a)):
+                    if t > EPS and self.y_min <= oy + dy * t <= self.y_max:
+                        best = (t, 0.0)
+                        break
         
+        # Intersección con las tapas: sólo reemplazan si están estrictamente más cerca
         if abs(dy) > EPS:
-            # Tapa superior
-            t_top = (y_max - oy) / dy
-            if t_top > EPS:
-                x_hit = ox + dx * t_top
-                z_hit = oz + dz * t_top
-                if x_hit * x_hit + z_hit * z_hit <= self.radius * self.radius:
-                    if t_side is None or t_top < t_side:
-                        t_cap = t_top
-                        normal_cap = np.array([0.0, 1.0, 0.0], dtype=np.float32)
-            
-            # Tapa inferior
-            t_bottom = (y_min - oy) / dy
-            if t_bottom > EPS:
-                x_hit = ox + dx * t_bottom
-                z_hit = oz + dz * t_bottom
-                if x_hit * x_hit + z_hit * z_hit <= self.radius * self.radius:
-                    if (t_cap is None or t_bottom < t_cap) and (t_side is None or t_bottom < t_side):
-                        t_cap = t_bottom
-                        normal_cap = np.array([0.0, -1.0, 0.0], dtype=np.float32)
-        
-        # Elegir la intersección más cercana
-        if t_side is None and t_cap is None:
-            return None
-            
-        if t_cap is None or (t_side is not None and t_side < t_cap):
-            hit = orig + dir * t_side
-            return Intercept(point=hit, normal=normal_side, distance=t_side, 
-                           texcoords=texcoords, obj=self)
+            for y_cap, ny in ((self.y_max, 1.0), (self.y_min, -1.0)):
+                t = (y_cap - oy) / dy
+                if t > EPS and (best is None or t < best[0]):
+                    x_hit = ox + dx * t
+                    z_hit = oz + dz * t
+                    if x_hit * x_hit + z_hit * z_hit <= self.r2:
+                        best = (t, ny)
+        return best
+
+    def surface(self, orig, dir, t, payload):
+        ny = payload
+        hit = orig + dir * t
+        hit_local = (orig - self.position) + dir * t
+        
+        if ny == 0.0:
+            # Normal lateral (perpendicular al eje Y) y UV cilíndrico
+            normal = vec.normalize((hit_local[0], 0.0, hit_local[2]))
+            theta = np.arctan2(hit_local[2], hit_local[0])
+            u = (theta / (2.0 * np.pi)) + 0.5
+            v = (hit_local[1] - self.y_min) / self.height
         else:
-            hit = orig + dir * t_cap
-            return Intercept(point=hit, normal=normal_cap, distance=t_cap, obj=self)
+            # UV de las tapas: proyección plana sobre XZ
+            normal = np.array([0.0, ny, 0.0], dtype=np.float32)
+            u = hit_local[0] / self.diameter + 0.5
+            v = hit_local[2] / self.diameter + 0.5
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        local_orig = origins - self.position
+        ox, oy, oz = local_orig.T
+        dx, dy, dz = directions.T
+
+        a = dx * dx + dz * dz
+        b = 2.0 * (ox * dx + oz * dz)
+        r2 = self.r2
+        c = ox * ox + oz * oz - r2
+        y_min = self.y_min
+        y_max = self.y_max
+
+        # Superficie lateral: primera raíz válida dentro de la altura
+        disc = b * b - 4 * a * c
+        side_ok = (np.abs(a) > EPS) & (disc >= 0)
+        safe_a = np.where(side_ok, a, 1.0)
+        sqrt_disc = np.sqrt(np.maximum(disc, 0.0))
+        t = np.full(len(a), np.inf)
+        for t_candidate in ((-b + sqrt_disc) / (2 * safe_a), (-b - sqrt_disc) / (2 * safe_a)):
+            y_hit = oy + dy * t_candidate
+            valid = side_ok & (t_candidate > EPS) & (y_min <= y_hit) & (y_hit <= y_max)
+            t = np.where(valid, t_candidate, t)
+        side = np.isfinite(t)
+
+        # Tapas: sólo reemplazan si están estrictamente más cerca
+        cap_normal_y = np.zeros(len(a))
+        cap_ok = np.abs(dy) > EPS
+        safe_dy = np.where(cap_ok, dy, 1.0)
+        for y_cap, ny in ((y_max, 1.0), (y_min, -1.0)):
+            t_cap = (y_cap - oy) / safe_dy
+            x_hit = ox + dx * t_cap
+            z_hit = oz + dz * t_cap
+            valid = cap_ok & (t_cap > EPS) & (x_hit * x_hit + z_hit * z_hit <= r2) & (t_cap < t)
+            t = np.where(valid, t_cap, t)
+            side &= ~valid
+            cap_normal_y = np.where(valid, ny, cap_normal_y)
+
+        hit = np.isfinite(t)
+        cap = hit & ~side
+        n = len(t)
+        normals = np.zeros((n, 3))
+        uvs = np.zeros((n, 2))
+        hit_local = local_orig + directions * np.where(hit, t, 0.0)[:, None]
+
+        normals[side] = normalize_many(hit_local[side] * [1.0, 0.0, 1.0])
+        theta = np.arctan2(hit_local[side, 2], hit_local[side, 0])
+        uvs[side, 0] = theta / (2.0 * np.pi) + 0.5
+        uvs[side, 1] = (hit_local[side, 1] - y_min) / self.height
+
+        normals[cap, 1] = cap_normal_y[cap]
+        uvs[cap, 0] = hit_local[cap, 0] / self.diameter + 0.5
+        uvs[cap, 1] = hit_local[cap, 2] / self.diameter + 0.5
+        return t, normals, uvs
 
 # Elipsoide
 class Ellipsoid(Shape):
+    __slots__ = ("radii", "rx", "ry", "rz", "inv_radii", "radii2")
+
     def __init__(self, position, radii, material):
         super().__init__(position, material)
         self.radii = np.array(radii, dtype=np.float32)
         self.rx, self.ry, self.rz = self.radii
+        self.inv_radii = 1.0 / self.radii
+        self.radii2 = self.radii * self.radii
         self.type = "Ellipsoid"
 
-    def ray_intersect(self, orig, dir):
+    def bounds(self):
+        return (self.position - self.radii, self.position + self.radii)
+
+    def hit(self, orig, dir):
         # Transformar a espacio de esfera unitaria
-        scale = 1.0 / self.radii
+        scale = self.inv_radii
         o_scaled = (orig - self.position) * scale
         d_scaled = dir * scale
         
@@ -291,7 +686,9 @@ class Ellipsoid(Shape):
         t = t0 if t0 > EPS else t1
         if t < EPS:
             return None
-            
+        return t, None
+
+    def surface(self, orig, dir, t, payload):
         # Punto de impacto en espacio original
         hit = orig + dir * t
         
@@ -299,58 +696,108 @@ class Ellipsoid(Shape):
         # Para (x²/rx² + y²/ry² + z²/rz² - 1 = 0)
         # ∇f = (2x/rx², 2y/ry², 2z/rz²)
         local = hit - self.position
-        normal_local = local / (self.radii * self.radii)
+        normal_local = local / self.radii2
         normal = normalize(normal_local)
+        u, v = _spherical_uv(normalize(local * self.inv_radii))
         
-        return Intercept(point=hit, normal=normal, distance=t, obj=self)
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def intersect_many(self, origins, directions):
+        scale = self.inv_radii
+        o_scaled = (origins - self.position) * scale
+        d_scaled = directions * scale
+
+        a = dot_many(d_scaled, d_scaled)
+        b = 2.0 * dot_many(o_scaled, d_scaled)
+        c = dot_many(o_scaled, o_scaled) - 1.0
+
+        disc = b * b - 4 * a * c
+        sqrt_disc = np.sqrt(np.maximum(disc, 0.0))
+        t0 = (-b - sqrt_disc) / (2 * a)
+        t1 = (-b + sqrt_disc) / (2 * a)
+        t = np.where(t0 > EPS, t0, t1)
+        ok = (disc >= 0) & (t >= EPS)
+        t = np.where(ok, t, np.inf)
+
+        normals = np.zeros((len(t), 3))
+        uvs = np.zeros((len(t), 2))
+        local = origins[ok] + directions[ok] * t[ok, None] - self.position
+        normals[ok] = normalize_many(local / self.radii2)
+        uvs[ok, 0], uvs[ok, 1] = _spherical_uv(normalize_many(local * scale))
+        return t, normals, uvs
 
 # Toro (cuártico)
 class Torus(Shape):
+    __slots__ = ("R", "r", "R2", "r2", "four_R2", "bound_r2")
+
     def __init__(self, position, R, r, material):
         super().__init__(position, material)
         self.R = float(R)  # Radio mayor (centro del tubo)
         self.r = float(r)  # Radio menor (radio del tubo)
+        self.R2 = self.R * self.R
+        self.r2 = self.r * self.r
+        self.four_R2 = 4.0 * self.R2
+        self.bound_r2 = (self.R + self.r) ** 2  # Esfera envolvente
         self.type = "Torus"
 
-    def ray_intersect(self, orig, dir):
-        # Transformar a espacio local
-        local_orig = orig - self.position
-        
-        ox, oy, oz = local_orig
-        dx, dy, dz = dir
-        
-        R, r = self.R, self.r
-        
-        # Coeficientes del polinomio cuártico
+    def bounds(self):
+        ext = np.array([self.R + self.r, self.r, self.R + self.r], dtype=np.float32)
+        return (self.position - ext, self.position + ext)
+
+    def _coeffs(self, ox, oy, oz, dx, dy, dz):
+        # at⁴ + bt³ + ct² + dt + e = 0 (escalares o arreglos)
         sum_d_sq = dx*dx + dy*dy + dz*dz
-        e = ox*ox + oy*oy + oz*oz - R*R - r*r
+        e = ox*ox + oy*oy + oz*oz - self.R2 - self.r2
         f = ox*dx + oy*dy + oz*dz
-        four_R2 = 4.0 * R * R
-        
-        # at⁴ + bt³ + ct² + dt + e = 0
-        coeffs = [
-            sum_d_sq * sum_d_sq,                                   
-            4.0 * sum_d_sq * f,                                    
-            2.0 * sum_d_sq * e + 4.0 * f * f + four_R2 * dy * dy,  
-            4.0 * f * e + 2.0 * four_R2 * oy * dy,                
-            e * e - four_R2 * (r * r - oy * oy)               
+        four_R2 = self.four_R2
+        return [
+            sum_d_sq * sum_d_sq,
+            4.0 * sum_d_sq * f,
+            2.0 * sum_d_sq * e + 4.0 * f * f + four_R2 * dy * dy,
+            4.0 * f * e + 2.0 * four_R2 * oy * dy,
+            e * e - four_R2 * (self.r2 - oy * oy)
         ]
-        
-        # Resolver polinomio cuártico
-        try:
-            roots = np.roots(coeffs)
-        except:
+
+    def hit(self, orig, dir):
+        # Transformar a espacio local
+        ox, oy, oz = (float(x) for x in orig - self.position)
+        dx, dy, dz = (float(x) for x in dir)
+
+        # Rechazo con la esfera envolvente de radio R + r
+        dd = dx*dx + dy*dy + dz*dz
+        od = ox*dx + oy*dy + oz*dz
+        disc = od*od - dd * (ox*ox + oy*oy + oz*oz - self.bound_r2)
+        if disc <= 0.0:
             return None
-            
-        valid_roots = []
-        for root in roots:
-            if abs(root.imag) < EPS and root.real > EPS:
-                valid_roots.append(root.real)
-        
-        if not valid_roots:
+        sq = math.sqrt(disc)
+        t_lo = (-od - sq) / dd
+        t_hi = (-od + sq) / dd
+
+        # Recorte con la franja |y| <= r
+        r = self.r
+        if dy != 0.0:
+            ty0 = (-r - oy) / dy
+            ty1 = (r - oy) / dy
+            if ty0 > ty1:
+                ty0, ty1 = ty1, ty0
+            t_lo = max(t_lo, ty0)
+            t_hi = min(t_hi, ty1)
+        elif abs(oy) > r:
             return None
-            
-        t = min(valid_roots)
+        t_lo = max(t_lo, EPS)
+        if t_hi < t_lo:
+            return None
+
+        # Polinomio desde el punto de entrada: coeficientes mejor condicionados
+        coeffs = self._coeffs(ox + dx * t_lo, oy + dy * t_lo, oz + dz * t_lo, dx, dy, dz)
+        s = first_root(coeffs, 0.0, t_hi - t_lo)
+        if s is None:
+            return None
+        return t_lo + s, None
+
+    def surface(self, orig, dir, t, payload):
+        local_orig = orig - self.position
         hit_local = local_orig + dir * t
         
         # Calcular normal 
@@ -359,14 +806,144 @@ class Torus(Shape):
         
         # Término auxiliar
         sum_sq = x*x + y*y + z*z
-        Q = sum_sq + R*R - r*r
+        Q = sum_sq + self.R2 - self.r2
         
         # Gradiente
-        nx = 4.0 * x * Q - 8.0 * R * R * x
+        nx = 4.0 * x * Q - 2.0 * self.four_R2 * x
         ny = 4.0 * y * Q
-        nz = 4.0 * z * Q - 8.0 * R * R * z
+        nz = 4.0 * z * Q - 2.0 * self.four_R2 * z
         
-        normal = normalize(np.array([nx, ny, nz], dtype=np.float32))
+        normal = vec.normalize((nx, ny, nz))
         hit = hit_local + self.position
+        u, v = self._uv(hit_local)
         
-        return Intercept(point=hit, normal=normal, distance=t, obj=self)
\ No newline at end of file
+        return Intercept(point=hit, normal=normal, distance=t,
+                         texcoords=(float(u), float(v)), obj=self)
+
+    def _uv(self, hit_local):
+        # u: ángulo alrededor del eje Y, v: ángulo alrededor del tubo
+        x, y, z = hit_local[..., 0], hit_local[..., 1], hit_local[..., 2]
+        u = np.arctan2(z, x) / (2.0 * np.pi) + 0.5
+        v = np.arctan2(y, np.sqrt(x*x + z*z) - self.R) / (2.0 * np.pi) + 0.5
+        return u, v
+
+    def intersect_many(self, origins, directions):
+        local_orig = origins - self.position
+        ox, oy, oz = local_orig.T
+        dx, dy, dz = directions.T
+        n = len(origins)
+
+        # Esfera envolvente y franja |y| <= r, como en ray_intersect
+        dd = dx*dx + dy*dy + dz*dz
+        od = ox*dx + oy*dy + oz*dz
+        disc = od*od - dd * (ox*ox + oy*oy + oz*oz - self.bound_r2)
+        sq = np.sqrt(np.maximum(disc, 0.0))
+        t_lo = (-od - sq) / dd
+        t_hi = (-od + sq) / dd
+
+        r = self.r
+        flat = dy == 0.0
+        inside = np.abs(oy) <= r
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ty0 = (-r - oy) / dy
+            ty1 = (r - oy) / dy
+        t_lo = np.maximum(t_lo, np.where(flat, np.where(inside, -np.inf, np.inf), np.minimum(ty0, ty1)))
+        t_hi = np.minimum(t_hi, np.where(flat, np.where(inside, np.inf, -np.inf), np.maximum(ty0, ty1)))
+        t_lo = np.maximum(t_lo, EPS)
+
+        t = np.full(n, np.inf)
+        cand = np.nonzero((disc > 0.0) & (t_hi >= t_lo))[0]
+        if len(cand):
+            shift = t_lo[cand]
+            d = directions[cand]
+            o = local_orig[cand] + d * shift[:, None]
+            coeffs = np.stack(self._coeffs(*o.T, *d.T), axis=1)
+            t[cand] = shift + first_root_many(coeffs, np.zeros(len(cand)), t_hi[cand] - shift)
+        ok = np.isfinite(t)
+
+        normals = np.zeros((n, 3))
+        uvs = np.zeros((n, 2))
+        hit_local = local_orig[ok] + directions[ok] * t[ok, None]
+        x, y, z = hit_local.T
+        Q = x*x + y*y + z*z + self.R2 - self.r2
+        grad = np.stack([4.0 * x * Q - 2.0 * self.four_R2 * x,
+                         4.0 * y * Q,
+                         4.0 * z * Q - 2.0 * self.four_R2 * z], axis=1)
+        normals[ok] = normalize_many(grad)
+        uvs[ok, 0], uvs[ok, 1] = self._uv(hit_local)
+        return t, normals, uvs
+# Instancia
+class Instance(Shape):
+    """
+    Una figura compartida (típicamente una TriangleMesh con su BVH) colocada
+    con una matriz 4x4 objeto -> mundo. La geometría no se copia: el rayo
+    pasa a espacio objeto con la inversa, su dirección se normaliza y t se
+    reescala; la normal vuelve con la transpuesta de la inversa.
+    material=None usa el material de la figura. La animación la usa
+    también para mover objetos entre cuadros.
+    """
+    __slots__ = ("shape", "matrix", "inverse", "_inv3", "_inv_t")
+
+    def __init__(self, shape, matrix, material=None):
+        matrix = np.array(matrix, dtype=np.float64).reshape(4, 4)
+        if isinstance(shape, Instance):
+            matrix = matrix @ shape.matrix
+            material = shape.material if material is None else material
+            shape = shape.shape
+        super().__init__(matrix[:3, 3], shape.material if material is None else material)
+        self.shape = shape
+        self.matrix = matrix
+        self.inverse = np.linalg.inv(matrix)
+        self._inv3 = self.inverse[:3, :3].copy()
+        self._inv_t = self.inverse[:3, 3].copy()
+        self.type = shape.type
+
+    @classmethod
+    def place(cls, shape, position=(0, 0, 0), rotation=(0, 0, 0), scale=1.0, material=None):
+        """Instancia con escala, rotación (grados, orden X, Y, Z) y traslación."""
+        return cls(shape, transform_matrix(position, rotation, scale), material)
+
+    def freeze(self):
+        self.shape.freeze()
+        return super().freeze()
+
+    def bounds(self):
+        lo, hi = self.shape.bounds()
+        if not (np.all(np.isfinite(lo)) and np.all(np.isfinite(hi))):
+            return super().bounds()
+        corners = np.array([[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+        world = corners @ self.matrix[:3, :3].T + self.matrix[:3, 3]
+        return (world.min(axis=0), world.max(axis=0))
+
+    def _local(self, orig, dir):
+        """Rayo en espacio objeto: (origen, dirección unitaria, |d| por unidad de t del mundo)."""
+        o = self._inv3 @ np.asarray(orig, dtype=np.float64) + self._inv_t
+        d = self._inv3 @ np.asarray(dir, dtype=np.float64)
+        scale = math.sqrt(d @ d)
+        return o, d / scale, scale
+
+    def hit(self, orig, dir):
+        o, d, scale = self._local(orig, dir)
+        h = self.shape.hit(o, d)
+        return None if h is None else (h[0] / scale, h[1])
+
+    def hit_distance(self, orig, dir):
+        o, d, scale = self._local(orig, dir)
+        t = self.shape.hit_distance(o, d)
+        return None if t is None else t / scale
+
+    def surface(self, orig, dir, t, payload):
+        o, d, scale = self._local(orig, dir)
+        hit = self.shape.surface(o, d, t * scale, payload)
+        hit.point = (np.asarray(orig, dtype=np.float64) + np.asarray(dir, dtype=np.float64) * t).astype(np.float32)
+        hit.normal = normalize(self._inv3.T @ hit.normal)
+        hit.distance = float(t)
+        hit.obj = self
+        return hit
+
+    def intersect_many(self, origins, directions):
+        o = origins @ self._inv3.T + self._inv_t
+        d = directions @ self._inv3.T
+        scale = np.linalg.norm(d, axis=1)
+        t, normals, uvs = self.shape.intersect_many(o, d / scale[:, None])
+        return t / scale, normalize_many(normals @ self._inv3), uvs
@@ -1,10 +1,38 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
 import numpy as np
-from Textures.MathLib import normalize, reflect, refract
+from Textures.MathLib import normalize, normalize_many, dot_many
+from Textures.MathLib import scalar as vec
 from Textures.intercept import Intercept
 from Textures.envmap import EnvMap   
+from Textures.bvh import BVH
+from Textures.stats import RenderStats
 
 EPS = 1e-4
 
+# Estado de cada proceso del render por tiles
+_worker_rt = None
+_worker_shm = None
+
+def _tile_worker_init(payload, shm_name, shape):
+    """Recibe la escena una sola vez y enlaza el framebuffer compartido."""
+    global _worker_rt, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_rt = pickle.loads(payload)
+    _worker_rt.framebuffer = np.ndarray(shape, dtype=np.float32, buffer=_worker_shm.buf)
+    if _worker_rt.stats is not None:
+        _worker_rt.stats = RenderStats()
+
+def _tile_worker_render(tile, mode):
+    _worker_rt.render_tile(*tile, mode=mode)
+    # Las estadísticas del tile vuelven al proceso principal
+    stats = _worker_rt.stats
+    if stats is not None:
+        _worker_rt.stats = RenderStats()
+    return tile, stats
+
 class Raytracer:
     def __init__(self, width, height):
         self.width  = width
@@ -24,81 +52,748 @@ class Raytracer:
         self.fov = 60
         self.framebuffer = np.zeros((height, width, 3), dtype=np.float32)
 
+        # Estructura de aceleración (se construye al iniciar el render)
+        self.accel = None
+        self._bounded = []      # índices en scene de figuras dentro del BVH
+        self._unbounded = []    # índices en scene de figuras infinitas (planos)
+        self._accel_objs = None # figuras de scene cuando se construyó el BVH
+
+        # Último oclusor encontrado por luz (índice en lights -> índice en scene)
+        self._last_occluder = {}
+
+        self.aa_refined_fraction = 0.0
+
+        # Estadísticas opcionales (enable_stats); None = desactivadas
+        self.stats = None
+
+        # Fondo de los rayos primarios (primary_background): (clave, env map, LUT, imagen)
+        self._primary_bg = None
+
+    def enable_stats(self):
+        """Activa (o reinicia) el recolector de estadísticas y lo retorna."""
+        self.stats = RenderStats()
+        return self.stats
+
+    def build_accel(self):
+        """
+        Construye el BVH sobre las cajas de las figuras acotadas de la escena.
+        Las figuras se congelan (freeze) para que el BVH no quede desactualizado.
+        """
+        self._bounded, self._unbounded = [], []
+        self._last_occluder = {}
+        los, his = [], []
+        for k, obj in enumerate(self.scene):
+            if hasattr(obj, "freeze"):
+                obj.freeze()
+            lo, hi = obj.bounds()
+            if np.all(np.isfinite(lo)) and np.all(np.isfinite(hi)):
+                self._bounded.append(k)
+                los.append(lo); his.append(hi)
+            else:
+                self._unbounded.append(k)
+        self.accel = BVH(los, his) if los else None
+        self._accel_objs = list(self.scene)
+
+    def update_accel(self):
+        """
+        Deja el BVH al día antes de renderizar. Si scene no cambió desde el
+        último build_accel no hace nada; si sólo se reemplazaron figuras
+        acotadas por otras acotadas (animación) ajusta sus cajas con refit;
+        en otro caso lo reconstruye.
+        """
+        prev = self._accel_objs
+        if prev is None or len(prev) != len(self.scene):
+            return self.build_accel()
+        moved = [k for k, (old, obj) in enumerate(zip(prev, self.scene)) if old is not obj]
+        if not moved:
+            return
+
+        slot = {k: p for p, k in enumerate(self._bounded)}
+        prims, los, his = [], [], []
+        for k in moved:
+            obj = self.scene[k]
+            if hasattr(obj, "freeze"):
+                obj.freeze()
+            lo, hi = obj.bounds()
+            if k not in slot or not (np.all(np.isfinite(lo)) and np.all(np.isfinite(hi))):
+                return self.build_accel()
+            prims.append(slot[k]); los.append(lo); his.append(hi)
+        self.accel.refit(prims, los, his)
+        self._last_occluder = {}
+        self._accel_objs = list(self.scene)
+
     # Bucle de render
-    def render(self):
-        fov_scale = np.tan(np.radians(self.fov) * 0.5)
+    def render(self, mode="scalar", workers=None, tile=32):
+        """
+        mode="scalar": un cast_ray por pixel (referencia).
+        mode="packet": todos los rayos primarios como un solo arreglo.
+        workers=N: reparte tiles de tile x tile entre N procesos que
+                   escriben en un framebuffer de memoria compartida.
+        """
+        self.update_accel()
+        self.primary_background()
+        if workers is not None and workers > 1:
+            return self.render_parallel(workers, mode, tile)
+        if mode == "packet":
+            return self.render_packet()
+
         w = self.width; h = self.height
 
         print("Iniciando render...")
         for j in range(h):
             if h >= 20 and j % (h // 20) == 0:
                 print(f"{int(100*j/h)}% ...")
-            y_ndc = (1 - 2 * ((j + 0.5) / h))  
-            for i in range(w):
-                x_ndc = (2 * ((i + 0.5) / w) - 1) * self.aspect_ratio
-                direction = normalize(np.array([x_ndc * fov_scale, y_ndc * fov_scale, -1.0], dtype=np.float32))
-                self.framebuffer[j, i] = self.cast_ray(self.eye, direction)
+            self.render_tile(0, j, w, j + 1)
+        print("100% ... listo!")
+
+    def render_tile(self, x0, y0, x1, y1, mode="scalar"):
+        """Renderiza el rectángulo [x0, x1) x [y0, y1) del framebuffer."""
+        if mode == "packet":
+            origins, dirs = self.primary_rays(x0, y0, x1, y1)
+            bg = self.primary_background()
+            if bg is not None:
+                bg = bg[y0:y1, x0:x1].reshape(-1, 3)
+            colors = self.cast_rays(origins, dirs, background=bg)
+            self.framebuffer[y0:y1, x0:x1] = colors.reshape(y1 - y0, x1 - x0, 3)
+            return
+
+        for j in range(y0, y1):
+            for i in range(x0, x1):
+                self.framebuffer[j, i] = self.render_pixel(i, j)
+
+    def pixel_direction(self, i, j, ox=0.5, oy=0.5):
+        """Dirección del rayo primario por el punto (ox, oy) dentro del pixel (i, j)."""
+        fov_scale = np.tan(np.radians(self.fov) * 0.5)
+        y_ndc = (1 - 2 * ((j + oy) / self.height))
+        x_ndc = (2 * ((i + ox) / self.width) - 1) * self.aspect_ratio
+        return vec.normalize((x_ndc * fov_scale, y_ndc * fov_scale, -1.0))
+
+    def render_pixel(self, i, j):
+        bg = self.primary_background()
+        return self.cast_ray(self.eye, self.pixel_direction(i, j), background=None if bg is None else bg[j, i])
+
+    def primary_background(self):
+        """
+        Fondo (H, W, 3) que ve el rayo primario de cada pixel, o None sin
+        envmap. Sólo depende de la resolución, el fov y el env map (no de
+        eye), así que se calcula una vez con sample_many y se reutiliza
+        entre renders y cuadros mientras esos no cambien.
+        """
+        if self.envmap is None:
+            return None
+        # El env map y su LUT se guardan (no su id): un objeto nuevo en la
+        # dirección de uno liberado no debe reutilizar el fondo viejo
+        key = (self.width, self.height, float(self.fov), float(self.env_intensity))
+        lut = getattr(self.envmap, "lut", None)
+        cached = self._primary_bg
+        if cached is None or cached[0] != key or cached[1] is not self.envmap or cached[2] is not lut:
+            _, dirs = self.primary_rays()
+            if self.stats is None:
+                colors = self.background_many(dirs)
+            else:
+                colors = self.stats.timed("background", self.background_many, dirs)
+            self._primary_bg = (key, self.envmap, lut, colors.reshape(self.height, self.width, 3))
+        return self._primary_bg[3]
+
+    # Anti-aliasing adaptativo
+    def render_adaptive(self, threshold=0.1, subsamples=4, mode="scalar", seed=0):
+        """
+        Un rayo por pixel y luego supermuestreo sólo donde hace falta:
+        pixeles cuyo color difiere de un vecino en más de threshold
+        (máximo por canal) o cuyo vecino pega en otro objeto.
+        Cada pixel marcado se reemplaza por el promedio de subsamples x
+        subsamples muestras estratificadas con jitter.
+        Retorna la fracción de pixeles refinados (también en aa_refined_fraction).
+        """
+        self.update_accel()
+        w = self.width; h = self.height
+        ids = np.full((h, w), -1, dtype=np.int64)
+        ids_of = {id(obj): k for k, obj in enumerate(self.scene)}
+        bg = self.primary_background()
+
+        print("Iniciando render (AA adaptativo)...")
+        if mode == "packet":
+            origins, dirs = self.primary_rays()
+            colors, idx = self.cast_rays(origins, dirs, return_ids=True,
+                                         background=None if bg is None else bg.reshape(-1, 3))
+            self.framebuffer[:] = colors.reshape(h, w, 3)
+            ids[:] = idx.reshape(h, w)
+        else:
+            for j in range(h):
+                for i in range(w):
+                    color, hit = self.cast_ray_hit(self.eye, self.pixel_direction(i, j),
+                                                   background=None if bg is None else bg[j, i])
+                    self.framebuffer[j, i] = color
+                    if hit is not None:
+                        ids[j, i] = ids_of[id(hit.obj)]
+
+        # Bordes: contraste o cambio de objeto con el vecino derecho / inferior
+        fb = self.framebuffer
+        edge = np.zeros((h, w), dtype=bool)
+        dx = (np.abs(fb[:, 1:] - fb[:, :-1]).max(axis=2) > threshold) | (ids[:, 1:] != ids[:, :-1])
+        dy = (np.abs(fb[1:] - fb[:-1]).max(axis=2) > threshold) | (ids[1:] != ids[:-1])
+        edge[:, 1:] |= dx; edge[:, :-1] |= dx
+        edge[1:] |= dy; edge[:-1] |= dy
+
+        jj, ii = np.nonzero(edge)
+        self.aa_refined_fraction = len(jj) / float(w * h)
+        print(f"Refinando {len(jj)} pixeles ({100 * self.aa_refined_fraction:.1f}%)...")
+
+        if len(jj):
+            # Estratos n x n con jitter reproducible
+            n = int(subsamples)
+            rng = np.random.default_rng(seed)
+            sy, sx = np.mgrid[0:n, 0:n]
+            jitter = rng.random((len(jj), n * n, 2))
+            ox = (sx.ravel()[None, :] + jitter[..., 0]) / n
+            oy = (sy.ravel()[None, :] + jitter[..., 1]) / n
+
+            if mode == "packet":
+                pi = np.repeat(ii, n * n); pj = np.repeat(jj, n * n)
+                origins, dirs = self.primary_rays_at(pi, pj, ox.ravel(), oy.ravel())
+                samples = self.cast_rays(origins, dirs).reshape(len(jj), n * n, 3)
+                fb[jj, ii] = samples.mean(axis=1)
+            else:
+                for k, (i, j) in enumerate(zip(ii.tolist(), jj.tolist())):
+                    acc = np.zeros(3, dtype=np.float32)
+                    for s in range(n * n):
+                        acc += self.cast_ray(self.eye, self.pixel_direction(i, j, ox[k, s], oy[k, s]))
+                    fb[j, i] = acc / (n * n)
+
+        print("100% ... listo!")
+        return self.aa_refined_fraction
+
+    # Render progresivo
+    def render_progressive(self, steps=(8, 4, 2, 1), mode="scalar", callback=None, progress=None):
+        """
+        Render por refinamiento: cada pasada calcula los pixeles de la
+        rejilla step x step que faltan y rellena los bloques vecinos.
+        Cada step debe dividir al anterior.
+        callback(step) se llama al terminar cada pasada; si retorna False
+        el render se detiene ahí. progress(step, hechos, total) se llama
+        dentro de cada pasada, tras cada fila (scalar) o banda de 32 filas
+        (packet), para atender la ventana en pasadas largas; si retorna
+        False la pasada se corta. Retorna el último step completado.
+        """
+        self.update_accel()
+        w = self.width; h = self.height
+        prev = None
+        for step in steps:
+            if prev is not None and prev % step != 0:
+                raise ValueError("cada step debe dividir al anterior")
+
+            jj, ii = np.mgrid[0:h:step, 0:w:step]
+            jj = jj.ravel(); ii = ii.ravel()
+            if prev is not None:
+                new = (jj % prev != 0) | (ii % prev != 0)
+                jj = jj[new]; ii = ii[new]
+
+            print(f"Pasada {step}x{step}: {len(jj)} pixeles...")
+            # jj viene ordenado: cada banda de filas es un tramo contiguo
+            band = 32 if mode == "packet" else 1
+            cuts = np.searchsorted(jj, np.append(np.arange(0, h, band), h)).tolist()
+            for a, b in zip(cuts[:-1], cuts[1:]):
+                if a == b:
+                    continue
+                bj, bi = jj[a:b], ii[a:b]
+                if mode == "packet":
+                    origins, dirs = self.primary_rays_at(bi, bj)
+                    bg = self.primary_background()
+                    self.framebuffer[bj, bi] = self.cast_rays(origins, dirs, background=None if bg is None else bg[bj, bi])
+                else:
+                    for i, j in zip(bi.tolist(), bj.tolist()):
+                        self.framebuffer[j, i] = self.render_pixel(i, j)
+                if progress is not None and progress(step, b, len(jj)) is False:
+                    return prev
+
+            # Rellenar cada bloque con el color de su esquina
+            if step > 1:
+                coarse = self.framebuffer[::step, ::step]
+                filled = np.repeat(np.repeat(coarse, step, axis=0), step, axis=1)
+                self.framebuffer[:] = filled[:h, :w]
+
+            prev = step
+            if callback is not None and callback(step) is False:
+                break
+        return prev
+
+    # Render multiproceso
+    def render_parallel(self, workers, mode="scalar", tile=32):
+        w = self.width; h = self.height
+        tiles = [(x0, y0, min(x0 + tile, w), min(y0 + tile, h))
+                 for y0 in range(0, h, tile) for x0 in range(0, w, tile)]
+
+        # La escena se serializa una vez, sin el framebuffer
+        framebuffer = self.framebuffer
+        self.framebuffer = None
+        try:
+            payload = pickle.dumps(self)
+        finally:
+            self.framebuffer = framebuffer
+
+        shm = shared_memory.SharedMemory(create=True, size=framebuffer.nbytes)
+        try:
+            shared = np.ndarray(framebuffer.shape, dtype=np.float32, buffer=shm.buf)
+            print(f"Iniciando render ({workers} procesos, {len(tiles)} tiles)...")
+            with ProcessPoolExecutor(workers, initializer=_tile_worker_init,
+                                     initargs=(payload, shm.name, framebuffer.shape)) as pool:
+                futures = [pool.submit(_tile_worker_render, t, mode) for t in tiles]
+                step = max(1, len(tiles) // 20)
+                for done, future in enumerate(as_completed(futures), 1):
+                    _, stats = future.result()
+                    if stats is not None:
+                        self.stats.merge(stats)
+                    if done % step == 0:
+                        print(f"{int(100 * done / len(tiles))}% ...")
+            framebuffer[:] = shared
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+        print("100% ... listo!")
+
+    # Render por paquetes
+    def primary_rays(self, x0=0, y0=0, x1=None, y1=None):
+        """Rayos primarios del rectángulo [x0, x1) x [y0, y1): (origins, directions), (N, 3)."""
+        x1 = self.width if x1 is None else x1
+        y1 = self.height if y1 is None else y1
+        jj, ii = np.mgrid[y0:y1, x0:x1]
+        return self.primary_rays_at(ii.ravel(), jj.ravel())
+
+    def primary_rays_at(self, ii, jj, ox=0.5, oy=0.5):
+        """Rayos primarios por los pixeles (ii, jj); (ox, oy) es el punto dentro del pixel."""
+        fov_scale = np.tan(np.radians(self.fov) * 0.5)
+        x_ndc = (2 * ((ii + ox) / self.width) - 1) * self.aspect_ratio
+        y_ndc = 1 - 2 * ((jj + oy) / self.height)
+
+        dirs = np.empty((len(ii), 3), dtype=np.float64)
+        dirs[:, 0] = x_ndc * fov_scale
+        dirs[:, 1] = y_ndc * fov_scale
+        dirs[:, 2] = -1.0
+        dirs = normalize_many(dirs)
+        origins = np.broadcast_to(self.eye.astype(np.float64), dirs.shape)
+        return origins, dirs
+
+    def render_packet(self):
+        if self.accel is None:
+            self.build_accel()
+        print("Iniciando render (paquetes)...")
+        origins, dirs = self.primary_rays()
+        bg = self.primary_background()
+        colors = self.cast_rays(origins, dirs, background=None if bg is None else bg.reshape(-1, 3))
+        self.framebuffer[:] = colors.reshape(self.height, self.width, 3)
         print("100% ... listo!")
 
-    def cast_ray(self, orig, direction, depth=0):
-        hit = self.scene_intersect(orig, direction)
-        if hit is None:
-            if self.envmap is not None:
-                return np.clip(self.envmap.sample(direction) * self.env_intensity, 0, 1)
-            return self.backgroundColor.copy()
+    def cast_rays(self, origins, directions, depth=0, return_ids=False, background=None):
+        """
+        Versión por lotes de cast_ray: retorna colores (N, 3).
+        return_ids=True: retorna también el índice en scene de cada impacto (-1 si no pega).
+        background: colores (N, 3) ya calculados para los rayos que no pegan
+        (fondo en caché de los rayos primarios); None los calcula con background_many.
+
+        Integrador wavefront: todos los rayos de una profundidad se intersecan
+        y sombrean juntos, y los reflejados forman la cola de la siguiente,
+        que se achica a medida que los rayos terminan. Cada nivel guarda su
+        color local y, al final, los niveles se resuelven de abajo hacia
+        arriba con la misma mezcla y recorte que la versión recursiva.
+        """
+        stats = self.stats
+        levels = []     # por profundidad: (colores, filas con impacto, color local, reflejan, ks)
+        ids = None
 
-        return self.shade(hit, direction, depth)
+        while True:
+            n = len(directions)
+            colors = np.empty((n, 3), dtype=np.float32)
+            if stats is None:
+                t, idx, normals, uvs = self.scene_intersect_many(origins, directions)
+            else:
+                kind = "primary" if depth == 0 else "reflection"
+                stats.ray(kind, depth, n)
+                t, idx, normals, uvs = stats.timed(kind, self.scene_intersect_many, origins, directions)
+            if ids is None:
+                ids = idx
+            miss = idx < 0
+            if miss.any():
+                if background is not None:
+                    colors[miss] = background[miss]
+                elif stats is None:
+                    colors[miss] = self.background_many(directions[miss])
+                else:
+                    colors[miss] = stats.timed("background", self.background_many, directions[miss])
+
+            hit = np.nonzero(~miss)[0]
+            if len(hit) == 0:
+                levels.append((colors, hit, None, None, None))
+                break
+            points = origins[hit] + directions[hit] * t[hit, None]
+            args = (points, normals[hit], idx[hit], directions[hit], depth, uvs[hit])
+            if stats is None:
+                local, refl, ks, origins, directions = self.shade_many(*args)
+            else:
+                local, refl, ks, origins, directions = stats.timed("shading", self.shade_many, *args)
+            levels.append((colors, hit, local, refl, ks))
+            if len(directions) == 0:
+                break
+            depth += 1
+            background = None
+
+        below = None
+        for colors, hit, local, refl, ks in reversed(levels):
+            if len(hit):
+                if below is not None:
+                    local[refl] = (1 - ks) * local[refl] + ks * below
+                colors[hit] = np.clip(local, 0, 1)
+            below = colors
+        if return_ids:
+            return below, ids
+        return below
+
+    def pixel_angle(self):
+        """Ángulo (radianes) que cubre un pixel en el centro de la imagen: la huella de cada rayo."""
+        return 2.0 * np.tan(np.radians(self.fov) * 0.5) / self.height
+
+    def background_many(self, directions):
+        if self.envmap is not None:
+            lod = self.envmap.lod_for(self.pixel_angle())
+            return np.clip(self.envmap.sample_many(directions, lod) * self.env_intensity, 0, 1)
+        return np.broadcast_to(self.backgroundColor, (len(directions), 3))
+
+    def scene_intersect_many(self, origins, directions):
+        """
+        Intersección más cercana para N rayos.
+        Retorna (t, idx, normals, uvs); idx = -1 donde no hay impacto.
+        """
+        n = len(directions)
+        t_best = np.full(n, np.inf)
+        idx = np.full(n, -1, dtype=np.int64)
+        normals = np.zeros((n, 3))
+        uvs = np.zeros((n, 2))
+        stats = self.stats
+
+        def test(k, rays):
+            t, nrm, uv = self.scene[k].intersect_many(origins[rays], directions[rays])
+            if stats is not None:
+                stats.test(self.scene[k].type, len(rays), int(np.isfinite(t).sum()))
+            closer = (t > EPS) & (t < t_best[rays])
+            sel = rays[closer]
+            t_best[sel] = t[closer]
+            idx[sel] = k
+            normals[sel] = nrm[closer]
+            uvs[sel] = uv[closer]
+
+        if self.accel is None:
+            everything = np.arange(n)
+            for k in range(len(self.scene)):
+                test(k, everything)
+            return t_best, idx, normals, uvs
+
+        everything = np.arange(n)
+        for k in self._unbounded:
+            test(k, everything)
+
+        def test_leaf(prims, rays):
+            for p in prims:
+                test(self._bounded[p], rays)
+
+        self.accel.traverse_many(origins, directions, t_best, test_leaf)
+        return t_best, idx, normals, uvs
+
+    def occluded_many(self, origins, directions, t_max):
+        """True para los rayos de sombra bloqueados antes de t_max."""
+        blocked = np.zeros(len(directions), dtype=bool)
+        # Límite por rayo; un rayo bloqueado queda en -1 para podar el BVH
+        t_limit = np.array(t_max, dtype=np.float64)
+        stats = self.stats
+
+        def test(k, rays):
+            rays = rays[~blocked[rays]]
+            if len(rays) == 0:
+                return
+            t, _, _ = self.scene[k].intersect_many(origins[rays], directions[rays])
+            if stats is not None:
+                stats.test(self.scene[k].type, len(rays), int(np.isfinite(t).sum()))
+            sel = rays[(t > EPS) & (t < t_max[rays])]
+            blocked[sel] = True
+            t_limit[sel] = -1.0
+
+        everything = np.arange(len(directions))
+        if self.accel is None:
+            for k in range(len(self.scene)):
+                test(k, everything)
+            return blocked
+
+        for k in self._unbounded:
+            test(k, everything)
+
+        def test_leaf(prims, rays):
+            for p in prims:
+                test(self._bounded[p], rays)
+
+        self.accel.traverse_many(origins, directions, t_limit, test_leaf)
+        return blocked
+
+    def shade_many(self, points, normals, idx, view_dirs, depth, uvs=None):
+        """
+        Luz directa de N impactos, sin recursión. Retorna (color sin recortar,
+        máscara de los que reflejan, ks (R, 1), origenes y direcciones de los
+        R rayos reflejados); cast_rays los traza en la siguiente profundidad.
+        """
+        mats = [obj.material for obj in self.scene]
+        m_color = np.array([m.color for m in mats], dtype=np.float64)[idx]
+        if uvs is not None:
+            self._texture_colors(mats, idx, uvs, m_color)
+        m_kd = np.array([m.kd for m in mats])[idx, None]
+        m_ks = np.array([m.ks for m in mats])[idx]
+        m_shin = np.array([max(1.0, m.shininess) for m in mats])[idx]
+
+        n = normalize_many(normals)
+        shadow_orig = points + n * EPS * 10
+        color = np.zeros((len(points), 3))
+
+        for light in self.lights:
+            if getattr(light, "type", "") == "AMBIENT":
+                color += m_color * light.intensity * m_kd
+                continue
+
+            if light.type == "DIRECTIONAL":
+                ldir = np.broadcast_to(normalize(-light.direction), points.shape)
+                dist_to_light = np.full(len(points), np.inf)
+            else:
+                to_light = light.position - points
+                dist_to_light = np.linalg.norm(to_light, axis=1)
+                ldir = normalize_many(to_light)
+            intensity = light.intensity
+
+            if self.stats is None:
+                lit = ~self.occluded_many(shadow_orig, ldir, dist_to_light)
+            else:
+                self.stats.ray("shadow", n=len(points))
+                lit = ~self.stats.timed("shadow", self.occluded_many, shadow_orig, ldir, dist_to_light)
+
+            diff = np.maximum(0.0, dot_many(n, ldir))
+            hdir = normalize_many(ldir - view_dirs)
+            spec = np.maximum(0.0, dot_many(n, hdir)) ** m_shin
+            contrib = m_color * intensity * m_kd * diff[:, None] + intensity * m_ks[:, None] * spec[:, None]
+            color += np.where(lit[:, None], contrib, 0.0)
+
+        refl = (m_ks > 0) & (depth < self.max_depth)
+        I = normalize_many(view_dirs[refl])
+        N = n[refl]
+        rdir = normalize_many(I - 2.0 * dot_many(I, N)[:, None] * N)
+        return color, refl, m_ks[refl, None], shadow_orig[refl], rdir
+
+    def _texture_colors(self, mats, idx, uvs, m_color):
+        """
+        Reemplaza en m_color el color de los impactos con material texturizado
+        por el de su textura: una llamada a sample_many por material.
+        """
+        textured = []
+        slot = np.full(len(mats), -1, dtype=np.int64)
+        seen = {}
+        for k, m in enumerate(mats):
+            if m.texture is None:
+                continue
+            if id(m) not in seen:
+                seen[id(m)] = len(textured)
+                textured.append(m)
+            slot[k] = seen[id(m)]
+        if not textured:
+            return
+
+        which = slot[idx]
+        for j, m in enumerate(textured):
+            rows = np.nonzero(which == j)[0]
+            if len(rows):
+                m_color[rows] = m.texture.sample_many(uvs[rows])
+
+    def cast_ray(self, orig, direction, depth=0, background=None):
+        """background: color ya calculado si el rayo no pega (fondo en caché); None usa background()."""
+        return self.trace(orig, direction, depth, background)[0]
+
+    def cast_ray_hit(self, orig, direction, background=None):
+        """Como cast_ray para un rayo primario, pero también retorna el Intercept (o None)."""
+        return self.trace(orig, direction, 0, background)
+
+    def trace(self, orig, direction, depth=0, background=None):
+        """
+        Evalúa el árbol de un rayo sin recursión: sigue la cadena de
+        reflexiones guardando en una pila (color local, ks) de cada rebote y
+        la resuelve de abajo hacia arriba. Con estadísticas cuenta cada rayo
+        y mide cada fase. Retorna (color, Intercept del primer impacto o None).
+        """
+        stats = self.stats
+        stack = []
+        first = None
+        while True:
+            if stats is None:
+                hit = self.scene_intersect(orig, direction)
+            else:
+                kind = "primary" if depth == 0 else "reflection"
+                stats.ray(kind, depth)
+                hit = stats.timed(kind, self.scene_intersect, orig, direction)
+            if not stack:
+                first = hit
+            if hit is None:
+                if background is not None:
+                    color = background
+                elif stats is None:
+                    color = self.background(direction)
+                else:
+                    color = stats.timed("background", self.background, direction)
+                break
+
+            if stats is None:
+                color, bounce = self.shade(hit, direction, depth)
+            else:
+                color, bounce = stats.timed("shading", self.shade, hit, direction, depth)
+            if bounce is None:
+                color = np.clip(color, 0, 1)
+                break
+            ks, orig, direction = bounce
+            stack.append((color, ks))
+            depth += 1
+            background = None
+
+        while stack:
+            local, ks = stack.pop()
+            color = np.clip((1 - ks) * local + ks * color, 0, 1)
+        return color, first
+
+    def background(self, direction):
+        if self.envmap is not None:
+            lod = self.envmap.lod_for(self.pixel_angle())
+            return np.clip(self.envmap.sample(direction, lod) * self.env_intensity, 0, 1)
+        return self.backgroundColor.copy()
 
     def scene_intersect(self, orig, direction):
-        nearest = None
+        """
+        Impacto más cercano en la escena. Durante el recorrido cada figura sólo
+        retorna (t, payload); el Intercept se construye una vez, para la ganadora.
+        """
+        if self.accel is None:
+            candidates = range(len(self.scene))
+        else:
+            candidates = self._unbounded
+
+        stats = self.stats
+        best = None     # (índice en scene, payload)
         min_dist = np.inf
-        for obj in self.scene:
-            h = obj.ray_intersect(orig, direction)
-            if h is not None and EPS < h.distance < min_dist:
-                nearest = h
-                min_dist = h.distance
-        return nearest
+        for k in candidates:
+            h = self.scene[k].hit(orig, direction)
+            if stats is not None:
+                stats.test(self.scene[k].type, 1, h is not None)
+            if h is not None and EPS < h[0] < min_dist:
+                min_dist, best = h[0], (k, h[1])
+
+        if self.accel is not None:
+            def test_leaf(prims, t_max):
+                found = None
+                for p in prims:
+                    k = self._bounded[p]
+                    h = self.scene[k].hit(orig, direction)
+                    if stats is not None:
+                        stats.test(self.scene[k].type, 1, h is not None)
+                    if h is not None and EPS < h[0] < t_max:
+                        t_max, found = h[0], (k, h[1])
+                return None if found is None else (t_max, (t_max, found))
+
+            res = self.accel.closest_hit(orig, direction, test_leaf, min_dist)
+            if res is not None:
+                min_dist, best = res
+
+        if best is None:
+            return None
+        k, payload = best
+        return self.scene[k].surface(orig, direction, min_dist, payload)
+
+    def occluded(self, orig, direction, t_max, light_key=None):
+        """
+        Consulta any-hit para rayos de sombra: True si alguna figura bloquea
+        el rayo antes de t_max. Termina en el primer bloqueo, no construye
+        Intercept y prueba primero el último oclusor de la misma luz.
+        """
+        stats = self.stats
+
+        def blocks(k):
+            t = self.scene[k].hit_distance(orig, direction)
+            if stats is not None:
+                stats.test(self.scene[k].type, 1, t is not None)
+            return t is not None and EPS < t < t_max
+
+        last = self._last_occluder.get(light_key)
+        if last is not None and blocks(last):
+            return True
+
+        candidates = range(len(self.scene)) if self.accel is None else self._unbounded
+        for k in candidates:
+            if k != last and blocks(k):
+                self._last_occluder[light_key] = k
+                return True
+        if self.accel is None:
+            return False
+
+        def test_leaf(prims):
+            for p in prims:
+                k = self._bounded[p]
+                if k != last and blocks(k):
+                    self._last_occluder[light_key] = k
+                    return True
+            return False
+
+        return self.accel.any_hit(orig, direction, test_leaf, t_max)
 
     def shade(self, hit: Intercept, view_dir, depth):
+        """
+        Luz directa en un impacto, sin recursión. Retorna (color sin recortar,
+        rebote); rebote es (ks, origen, dirección) del rayo reflejado o None.
+        """
         m = hit.obj.material
         p = hit.point
-        n = normalize(hit.normal)
+        # La textura, si hay, reemplaza al color del material
+        albedo = m.color
+        if m.texture is not None and hit.texcoords is not None:
+            albedo = m.texture.sample(*hit.texcoords)
+        # Aritmética por rayo con el backend escalar de MathLib (vec)
+        n = vec.normalize(hit.normal)
+        offset_orig = p + n * EPS * 10
 
         # Luz difusa + especular
         color = np.zeros(3, dtype=np.float32)
 
-        for light in self.lights:
+        for li, light in enumerate(self.lights):
             if getattr(light, "type", "") == "AMBIENT":
-                color += m.color * light.intensity * m.kd
+                color += albedo * light.intensity * m.kd
                 continue
 
             if light.type == "DIRECTIONAL":
-                ldir = normalize(-light.direction)
+                ldir = vec.normalize(-light.direction)
                 intensity = light.intensity
                 dist_to_light = np.inf
             else: 
-                ldir = normalize(light.position - p)
+                to_light = light.position - p
+                ldir = vec.normalize(to_light)
                 intensity = light.intensity
-                dist_to_light = np.linalg.norm(light.position - p)
+                dist_to_light = vec.length(to_light)
 
             # Sombras (shadow ray)
-            shadow_hit = self.scene_intersect(p + n * EPS * 10, ldir)
-            if shadow_hit is not None and shadow_hit.distance < dist_to_light:
+            if self.stats is None:
+                blocked = self.occluded(offset_orig, ldir, dist_to_light, li)
+            else:
+                self.stats.ray("shadow")
+                blocked = self.stats.timed("shadow", self.occluded, offset_orig, ldir, dist_to_light, li)
+            if blocked:
                 continue 
 
             # Difuso
-            diff = max(0.0, np.dot(n, ldir))
-            color += m.color * intensity * m.kd * diff
+            diff = max(0.0, vec.dot(n, ldir))
+            color += albedo * intensity * m.kd * diff
 
             # Especular
-            hdir = normalize(ldir - view_dir)
-            spec = max(0.0, np.dot(n, hdir)) ** max(1.0, m.shininess)
+            hdir = vec.normalize(ldir - view_dir)
+            spec = max(0.0, vec.dot(n, hdir)) ** max(1.0, m.shininess)
             color += np.array([1,1,1], dtype=np.float32) * intensity * m.ks * spec
 
-        # Reflexión
+        # Reflexión: trace sigue el rayo reflejado
         if m.ks > 0 and depth < self.max_depth:
-            rdir = reflect(view_dir, n)
-            rcol = self.cast_ray(p + n * EPS * 10, rdir, depth + 1)
-            color = (1 - m.ks) * color + m.ks * rcol
-
-        return np.clip(color, 0, 1)
+            return color, (m.ks, offset_orig, vec.reflect(view_dir, n))
+        return color, None
@@ -0,0 +1,141 @@
+import os
+import numpy as np
+
+from Textures.diskcache import write_arrays
+
+def _downsample(img):
+    """Promedio de bloques 2x2; un borde impar se replica antes de promediar."""
+    h, w = img.shape[:2]
+    if h > 1 and h % 2:
+        img = np.concatenate([img, img[-1:]], axis=0)
+    if w > 1 and w % 2:
+        img = np.concatenate([img, img[:, -1:]], axis=1)
+    if img.shape[0] > 1:
+        img = 0.5 * (img[0::2] + img[1::2])
+    if img.shape[1] > 1:
+        img = 0.5 * (img[:, 0::2] + img[:, 1::2])
+    return img
+
+class MipMap:
+    """
+    Pirámide de mips de una imagen RGB en [0,1], construida una vez al
+    cargar: levels[0] es la imagen completa y cada nivel promedia bloques
+    2x2 del anterior hasta llegar a 1x1. Los niveles se guardan contiguos
+    en uint8 (por defecto; exacto para imágenes de 8 bits) o float16, y se
+    pasan a float32 sólo al leer los texels: la pirámide completa ocupa 3x
+    (uint8) o 1.5x (float16) menos que la imagen en float32.
+
+    Las coordenadas siguen la convención de los samplers existentes:
+    x = u * (w - 1), y = (1 - v) * (h - 1), con u, v en [0, 1].
+
+    save(path) guarda los niveles como .npy y from_dir(path) los abre con
+    mmap; una pirámide abierta así se serializa (pickle) sólo con su ruta,
+    de modo que los procesos del render paralelo comparten las páginas.
+    """
+    def __init__(self, img, dtype=np.uint8):
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.uint8, np.float16, np.float32):
+            raise ValueError(f"dtype de mips no soportado: {self.dtype}")
+        level = np.asarray(img, dtype=np.float32)
+        self.levels = [self._store(level)]
+        while level.shape[0] > 1 or level.shape[1] > 1:
+            level = _downsample(level)
+            self.levels.append(self._store(level))
+        self.h, self.w = self.levels[0].shape[:2]
+        self.source = None
+
+    @classmethod
+    def from_dir(cls, path):
+        """Abre con mmap una pirámide guardada con save(); None si falta o está dañada."""
+        try:
+            names = sorted(n for n in os.listdir(path) if n.endswith(".npy"))
+            levels = [np.load(os.path.join(path, n), mmap_mode="r") for n in names]
+        except (OSError, ValueError):
+            return None
+        if not levels:
+            return None
+        self = cls.__new__(cls)
+        self.dtype = levels[0].dtype
+        self.levels = levels
+        self.h, self.w = levels[0].shape[:2]
+        self.source = path
+        return self
+
+    def save(self, path):
+        """Guarda los niveles en el directorio path (diskcache.write_arrays); True si quedó guardada."""
+        return write_arrays(path, {f"{k:02d}": level for k, level in enumerate(self.levels)})
+
+    def __getstate__(self):
+        if self.source is not None:
+            return {"source": self.source}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if "levels" not in state:
+            opened = MipMap.from_dir(state["source"])
+            if opened is None:
+                raise FileNotFoundError(f"Mips no encontrados en {state['source']}")
+            state = opened.__dict__
+        self.__dict__.update(state)
+
+    def _store(self, level):
+        if self.dtype == np.uint8:
+            return np.ascontiguousarray(np.rint(np.clip(level, 0.0, 1.0) * 255.0).astype(np.uint8))
+        return np.ascontiguousarray(level.astype(self.dtype))
+
+    def load(self, texels):
+        """Texels guardados -> float32 en [0,1]."""
+        if self.dtype == np.uint8:
+            return texels.astype(np.float32) / 255.0
+        return texels.astype(np.float32)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def lod(self, texels):
+        """Nivel de detalle para una huella de texels pixeles de levels[0] (0 si no hay minificación)."""
+        return np.log2(np.maximum(texels, 1.0))
+
+    def bilinear(self, k, u, v):
+        """Filtro bilineal del nivel k en u, v (N,) ya en [0, 1]; retorna (N,3) float32."""
+        level = self.levels[k]
+        h, w = level.shape[:2]
+        flat = level.reshape(-1, level.shape[2])
+        x = u * (w - 1)
+        y = (1.0 - v) * (h - 1)
+        x0 = x.astype(np.int64); x1 = np.minimum(x0 + 1, w - 1)
+        y0 = y.astype(np.int64); y1 = np.minimum(y0 + 1, h - 1)
+        sx = (x - x0).astype(np.float32)[:, None]
+        sy = (y - y0).astype(np.float32)[:, None]
+
+        r0 = y0 * w; r1 = y1 * w
+        c0 = self.load(flat.take(r0 + x0, axis=0)); c0 += (self.load(flat.take(r0 + x1, axis=0)) - c0) * sx
+        c1 = self.load(flat.take(r1 + x0, axis=0)); c1 += (self.load(flat.take(r1 + x1, axis=0)) - c1) * sx
+        c0 += (c1 - c0) * sy
+        return c0
+
+    def sample(self, u, v, lod=0.0):
+        """
+        Trilineal: bilineal en los dos niveles que rodean lod (número o
+        arreglo (N,)) y mezcla lineal entre ellos. u, v (N,) ya en [0, 1].
+        """
+        u = np.asarray(u, dtype=np.float64)
+        v = np.asarray(v, dtype=np.float64)
+        lod = np.clip(np.broadcast_to(np.asarray(lod, dtype=np.float64), u.shape), 0.0, len(self.levels) - 1)
+        if not lod.any():
+            return self.bilinear(0, u, v)
+
+        k0 = lod.astype(np.int64)
+        frac = (lod - k0).astype(np.float32)
+        out = np.empty((len(u), 3), dtype=np.float32)
+        for k in np.unique(k0).tolist():
+            rows = np.nonzero(k0 == k)[0]
+            color = self.bilinear(k, u[rows], v[rows])
+            f = frac[rows]
+            blend = f > 0.0
+            if blend.any():
+                upper = self.bilinear(k + 1, u[rows[blend]], v[rows[blend]])
+                color[blend] += (upper - color[blend]) * f[blend, None]
+            out[rows] = color
+        return out
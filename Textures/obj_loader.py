@@ -1,16 +1,162 @@
 # En esta parte le pedi ayuda a ChatGPT, porque no sabía si estaba corriendo correctamnete mi modelo, entonces son como avisos de que ya esta funcionando
+import hashlib
+import os
 import numpy as np
-from Textures.figures import Triangle
-from Textures.MathLib import normalize
+from Textures.figures import Triangle, TriangleMesh, Instance
+from Textures.MathLib import normalize_many, transform_matrix
+from Textures.diskcache import write_arrays
+
+# Caché binaria de mallas: __meshcache__/<nombre>-<hash>-v<versión>/ junto
+# al .obj, un .npy por arreglo (se abren con mmap)
+CACHE_DIR = "__meshcache__"
+CACHE_VERSION = 1
+ARRAYS = ("vertices", "normals", "texcoords", "faces", "face_normals",
+          "face_texcoords", "face_materials", "material_names")
+
+def _numbers(lines, n, dtype):
+    """
+    Las primeras n columnas de cada línea como arreglo (len(lines), n).
+    Todo el bloque se convierte de una vez; si alguna línea no tiene
+    exactamente n valores se recorre línea por línea.
+    """
+    try:
+        values = np.fromstring(" ".join(lines), sep=" ", dtype=dtype)
+        if values.size == n * len(lines):
+            return values.reshape(-1, n)
+    except ValueError:
+        pass
+    return np.array([(l.split() + ["0"] * n)[:n] for l in lines], dtype=dtype).reshape(-1, n)
+
+def _per_corner(buf, mask):
+    """Cuántas posiciones marcadas en mask caen en cada esquina de buf (esquinas separadas por un espacio)."""
+    cum = np.concatenate([[0], np.cumsum(mask)])
+    spaces = np.nonzero(buf == ord(" "))[0]
+    return cum[np.append(spaces, len(buf))] - cum[np.insert(spaces + 1, 0, 0)]
+
+def _corner_indices(corners):
+    """
+    Índices v/vt/vn (base 1, 0 = ausente) de cada esquina "v", "v/vt",
+    "v//vn" o "v/vt/vn", como arreglo (C, 3).
+    """
+    if not corners:
+        return np.zeros((0, 3), dtype=np.int64)
+    text = " ".join(corners)
+    slashes = corners[0].count("/")
+    doubles = corners[0].count("//")
+    # Todas las esquinas con el mismo formato (se revisa cada una, no sólo
+    # los totales): una sola conversión
+    buf = np.frombuffer(text.encode(), dtype=np.uint8)
+    slash = buf == ord("/")
+    if (np.all(_per_corner(buf, slash) == slashes)
+            and np.all(_per_corner(buf, slash & np.append(slash[1:], False)) == doubles)):
+        idx = _numbers([text.replace("//", "/0/").replace("/", " ")], (slashes + 1) * len(corners), np.int64)
+        idx = idx.reshape(len(corners), slashes + 1)
+        return np.pad(idx, ((0, 0), (0, 2 - slashes)))
+    fields = np.array([(c + "//").split("/")[:3] for c in corners], dtype=str)
+    fields[fields == ""] = "0"
+    return fields.astype(np.int64)
+
+def parse_obj(text):
+    """
+    Parsea el texto de un OBJ en bloque: un solo recorrido reparte las
+    líneas por tipo y los números de cada tipo se convierten de una vez.
+    Los polígonos se triangulan en abanico. Retorna un dict con:
+    - vertices (V, 3), normals (N, 3) unitarias, texcoords (T, 2): float32
+    - faces, face_normals, face_texcoords (F, 3): int32, índices base 0;
+      -1 donde la cara no trae normal o coordenada de textura
+    - face_materials (F,): índice en material_names (orden de aparición)
+    """
+    lines = {"v": [], "vn": [], "vt": []}
+    names, index = [], {}
+    current = "default"
+    corners, counts, mats = [], [], []
+    for line in text.splitlines():
+        parts = line.split(None, 1)
+        if not parts:
+            continue
+        tag, rest = parts[0], parts[1] if len(parts) > 1 else ""
+        if tag in lines:
+            lines[tag].append(rest)
+        elif tag == "f":
+            if current not in index:
+                index[current] = len(names); names.append(current)
+            tokens = rest.split()
+            corners += tokens
+            counts.append(len(tokens))
+            mats.append(index[current])
+        elif tag == "usemtl" and rest.strip():
+            current = rest.split()[0]
+            if current not in index:
+                index[current] = len(names); names.append(current)
+
+    vertices = _numbers(lines["v"], 3, np.float32)
+    normals = normalize_many(_numbers(lines["vn"], 3, np.float32)).astype(np.float32)
+    texcoords = _numbers(lines["vt"], 2, np.float32)
+
+    # Base 0; ausente -> -1; negativos relativos al final
+    idx = _corner_indices(corners)
+    sizes = np.array([len(vertices), len(texcoords), len(normals)])
+    idx = np.where(idx < 0, idx + sizes, idx - 1)
+
+    # Abanico (0, k, k+1) por polígono; los de menos de 3 esquinas se descartan
+    counts = np.array(counts, dtype=np.int64)
+    start = np.cumsum(counts) - counts
+    ntri = np.maximum(counts - 2, 0)
+    poly = np.repeat(np.arange(len(counts)), ntri)
+    k = np.arange(ntri.sum()) - np.repeat(np.cumsum(ntri) - ntri, ntri) + 1
+    first = start[poly]
+    tri = np.stack([first, first + k, first + k + 1], axis=1)
+
+    return {
+        "vertices": vertices,
+        "normals": normals,
+        "texcoords": texcoords,
+        "faces": idx[tri, 0].astype(np.int32).reshape(-1, 3),
+        "face_texcoords": idx[tri, 1].astype(np.int32).reshape(-1, 3),
+        "face_normals": idx[tri, 2].astype(np.int32).reshape(-1, 3),
+        "face_materials": np.array(mats, dtype=np.int32)[poly],
+        "material_names": np.array(names, dtype=str),
+    }
+
+def _cache_path(filepath, digest):
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    root = os.path.join(os.path.dirname(os.path.abspath(filepath)), CACHE_DIR)
+    return os.path.join(root, f"{stem}-{digest[:16]}-v{CACHE_VERSION}")
+
+def _read_cache(path):
+    try:
+        return {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in ARRAYS}
+    except (OSError, ValueError):
+        return None     # caché incompleta o dañada: se vuelve a parsear
+
+def load_obj_arrays(filepath, cache=True):
+    """
+    Arreglos de parse_obj para filepath. Con cache=True la primera carga
+    los guarda en __meshcache__ (clave: SHA-1 del archivo) y las siguientes
+    los abren con mmap sin parsear. Retorna (arrays, desde_cache).
+    """
+    with open(filepath, "rb") as f:
+        data = f.read()
+    path = _cache_path(filepath, hashlib.sha1(data).hexdigest())
+    if cache and os.path.isdir(path):
+        arrays = _read_cache(path)
+        if arrays is not None:
+            return arrays, True
+
+    arrays = parse_obj(data.decode("utf-8", errors="replace"))
+    if cache:
+        write_arrays(path, {name: arrays[name] for name in ARRAYS})
+    return arrays, False
 
 class OBJModel:
     """
     Carga un archivo .obj y genera triángulos para ray tracing.
     Soporta múltiples materiales.
     """
-    
-    def __init__(self, filepath, material=None, materials_dict=None, 
-                 scale=1.0, position=(0, 0, 0), rotation=(0, 0, 0)):
+
+    def __init__(self, filepath, material=None, materials_dict=None,
+                 scale=1.0, position=(0, 0, 0), rotation=(0, 0, 0), packed=True, cache=True,
+                 smooth=True):
         """
         Args:
             filepath: Ruta al archivo .obj
@@ -19,158 +165,75 @@ class OBJModel:
             scale: Escala del modelo (float o tuple de 3 valores)
             position: Posición (x, y, z) del modelo en la escena
             rotation: Rotación (rx, ry, rz) en grados
+            packed: Si es True genera un TriangleMesh por material en lugar
+                    de un Triangle por cara
+            cache: Usa la caché binaria (__meshcache__) si existe y la crea si no
+            smooth: Si el OBJ trae vn/vt, las mallas interpolan normales y UV
+                    por vértice (sombreado suave); False usa la normal de cada cara
         """
         self.filepath = filepath
         self.default_material = material
         self.materials_dict = materials_dict or {}
-        
+
         # Manejar escala como float o tuple
         if isinstance(scale, (int, float)):
             self.scale = np.array([scale, scale, scale], dtype=np.float32)
         else:
             self.scale = np.array(scale, dtype=np.float32)
-            
+
         self.position = np.array(position, dtype=np.float32)
         self.rotation = np.array(rotation, dtype=np.float32)
-        
-        self.vertices = []
-        self.normals = []
-        self.faces_by_material = {}  # Organizar caras por material
+
         self.triangles = []
-        
+        self.meshes = []
+        self.packed = packed
+        self.cache = cache
+        self.smooth = smooth
+
         self._load_obj()
         self._apply_transforms()
-        self._create_triangles()
-    
+        if packed:
+            self._create_meshes()
+        else:
+            self._create_triangles()
+
     def _load_obj(self):
-        """Lee el archivo OBJ y extrae vértices, normales y caras."""
-        print(f"\n Cargando OBJ: {self.filepath}")
-        
-        current_material = "default"
-        
+        """Lee el OBJ (o su caché) en arreglos: vértices, normales, caras y grupos por material."""
         try:
-            with open(self.filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    
-                    # Ignorar comentarios y líneas vacías
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Vértices (v x y z)
-                    if line.startswith('v '):
-                        parts = line.split()
-                        x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
-                        vertex = np.array([x, y, z], dtype=np.float32)
-                        self.vertices.append(vertex)
-                    
-                    # Normales (vn x y z)
-                    elif line.startswith('vn '):
-                        parts = line.split()
-                        nx, ny, nz = float(parts[1]), float(parts[2]), float(parts[3])
-                        normal = normalize(np.array([nx, ny, nz], dtype=np.float32))
-                        self.normals.append(normal)
-                    
-                    # Cambio de material
-                    elif line.startswith('usemtl '):
-                        material_name = line.split()[1]
-                        current_material = material_name
-                        if current_material not in self.faces_by_material:
-                            self.faces_by_material[current_material] = []
-                    
-                    # Caras (f v1/vt1/vn1 v2/vt2/vn2 v3/vt3/vn3)
-                    elif line.startswith('f '):
-                        parts = line.split()
-                        indices = []
-                        normal_indices = []
-                        
-                        for part in parts[1:]:
-                            values = part.split('/')
-                            # Índice de vértice (1-based en OBJ)
-                            idx = int(values[0]) - 1
-                            indices.append(idx)
-                            
-                            # Índice de normal (si existe)
-                            if len(values) >= 3 and values[2]:
-                                nidx = int(values[2]) - 1
-                                normal_indices.append(nidx)
-                        
-                        # Asegurar que hay lista para este material
-                        if current_material not in self.faces_by_material:
-                            self.faces_by_material[current_material] = []
-                        
-                        # Triangular si es necesario
-                        if len(indices) == 3:
-                            self.faces_by_material[current_material].append({
-                                'vertices': indices,
-                                'normals': normal_indices if normal_indices else None
-                            })
-                        elif len(indices) == 4:
-                            # Dividir quad en 2 triángulos
-                            self.faces_by_material[current_material].append({
-                                'vertices': [indices[0], indices[1], indices[2]],
-                                'normals': [normal_indices[0], normal_indices[1], normal_indices[2]] if normal_indices else None
-                            })
-                            self.faces_by_material[current_material].append({
-                                'vertices': [indices[0], indices[2], indices[3]],
-                                'normals': [normal_indices[0], normal_indices[2], normal_indices[3]] if normal_indices else None
-                            })
-                        elif len(indices) > 4:
-                            # Triangular polígonos con más de 4 vértices (fan triangulation)
-                            for i in range(1, len(indices) - 1):
-                                self.faces_by_material[current_material].append({
-                                    'vertices': [indices[0], indices[i], indices[i + 1]],
-                                    'normals': [normal_indices[0], normal_indices[i], normal_indices[i + 1]] if normal_indices else None
-                                })
-            
-            total_faces = sum(len(faces) for faces in self.faces_by_material.values())
-            
-            print(f"  ✓ Vértices: {len(self.vertices)}")
-            print(f"  ✓ Normales: {len(self.normals)}")
-            print(f"  ✓ Caras totales: {total_faces}")
-            print(f"  ✓ Materiales encontrados:")
-            for mat_name, faces in self.faces_by_material.items():
-                print(f"    • {mat_name}: {len(faces)} caras")
-            
+            arrays, cached = load_obj_arrays(self.filepath, self.cache)
         except FileNotFoundError:
             print(f"  ✗ ERROR: Archivo no encontrado: {self.filepath}")
             raise
-        except Exception as e:
-            print(f"  ✗ ERROR cargando OBJ: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
-    
+
+        self.vertices = arrays["vertices"]
+        self.normals = arrays["normals"]
+        self.texcoords = arrays["texcoords"]
+        self.faces = arrays["faces"]
+        self.face_normals = arrays["face_normals"]
+        self.face_texcoords = arrays["face_texcoords"]
+        self.face_materials = arrays["face_materials"]
+        self.material_names = [str(name) for name in arrays["material_names"]]
+
+        print(f" OBJ {self.filepath}: {len(self.vertices)} vértices, {len(self.faces)} caras, "
+              f"{len(self.material_names)} materiales" + (" (caché)" if cached else ""))
+
     def _apply_transforms(self):
-        """Aplica escala, rotación y traslación a los vértices."""
+        """Centra el modelo y aplica escala, rotación y traslación a los vértices."""
         if len(self.vertices) == 0:
             return
-        
-        # Convertir a array numpy
-        vertices = np.array(self.vertices)
-        
-        # Calcular centro y dimensiones
-        min_point = np.min(vertices, axis=0)
-        max_point = np.max(vertices, axis=0)
-        center = (min_point + max_point) / 2
-        dimensions = max_point - min_point
-        
-        print(f"\n Dimensiones originales: {dimensions}")
-        print(f"  Centro original: {center}")
-        
+
+        vertices = np.array(self.vertices, dtype=np.float32)
+
         # Centrar el modelo
+        center = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
         vertices -= center
-        
+
         # Aplicar escala
         vertices *= self.scale
-        
-        # Calcular nuevas dimensiones
-        new_dimensions = dimensions * self.scale
-        print(f"  Dimensiones escaladas: {new_dimensions}")
-        
+
         # Aplicar rotación (en orden: X, Y, Z)
         rx, ry, rz = np.radians(self.rotation)
-        
+
         # Rotación X
         if abs(rx) > 1e-6:
             Rx = np.array([
@@ -179,7 +242,7 @@ class OBJModel:
                 [0, np.sin(rx), np.cos(rx)]
             ])
             vertices = vertices @ Rx.T
-        
+
         # Rotación Y
         if abs(ry) > 1e-6:
             Ry = np.array([
@@ -188,7 +251,7 @@ class OBJModel:
                 [-np.sin(ry), 0, np.cos(ry)]
             ])
             vertices = vertices @ Ry.T
-        
+
         # Rotación Z
         if abs(rz) > 1e-6:
             Rz = np.array([
@@ -197,72 +260,90 @@ class OBJModel:
                 [0, 0, 1]
             ])
             vertices = vertices @ Rz.T
-        
+
         # Aplicar traslación
         vertices += self.position
-        
-        # Actualizar vértices
-        self.vertices = [v for v in vertices]
-        
-        # Calcular bounding box final
-        final_min = np.min(vertices, axis=0)
-        final_max = np.max(vertices, axis=0)
-        print(f"   Bounding box final:")
-        print(f"     Min: {final_min}")
-        print(f"     Max: {final_max}")
-    
-    def _create_triangles(self):
-        """Genera objetos Triangle a partir de las caras, usando materiales."""
-        print(f"\n  🔨 Generando triángulos...")
-        
-        for material_name, faces in self.faces_by_material.items():
-            # Determinar qué material usar
-            if self.materials_dict and material_name in self.materials_dict:
-                material = self.materials_dict[material_name]
-                print(f"    • {material_name}: usando material personalizado")
-            elif self.default_material is not None:
-                material = self.default_material
-                print(f"    • {material_name}: usando material por defecto")
-            else:
+        self.vertices = vertices
+
+        # Normales con la inversa transpuesta de escala y rotación
+        if len(self.normals):
+            linear = transform_matrix((0, 0, 0), self.rotation, self.scale)[:3, :3]
+            self.normals = normalize_many(self.normals @ np.linalg.inv(linear)).astype(np.float32)
+
+    def _material_for(self, material_name):
+        """Material asignado a un grupo de caras, o None si no hay."""
+        if self.materials_dict and material_name in self.materials_dict:
+            return self.materials_dict[material_name]
+        return self.default_material
+
+    def _groups(self):
+        """(nombre, material, filas de caras) por grupo de material con caras y material asignado."""
+        for m, material_name in enumerate(self.material_names):
+            material = self._material_for(material_name)
+            if material is None:
                 print(f"    ⚠ {material_name}: sin material asignado, saltando...")
                 continue
-            
-            # Crear triángulos para este material
-            triangles_count = 0
-            for face in faces:
-                vertex_indices = face['vertices']
-                
-                if len(vertex_indices) != 3:
-                    continue
-                
-                v0 = self.vertices[vertex_indices[0]]
-                v1 = self.vertices[vertex_indices[1]]
-                v2 = self.vertices[vertex_indices[2]]
-                
-                triangle = Triangle(
-                    A=v0.tolist(),
-                    B=v1.tolist(),
-                    C=v2.tolist(),
-                    material=material
-                )
-                
-                self.triangles.append(triangle)
-                triangles_count += 1
-            
-            print(f"      → {triangles_count} triángulos generados")
-        
-        print(f"  ✓ Total de triángulos: {len(self.triangles)}")
-    
+            rows = np.nonzero(self.face_materials == m)[0]
+            if len(rows):
+                yield material_name, material, rows
+
+    def _corner_normals(self, vertices, rows):
+        """
+        Normales (K, 3, 3) por esquina de las caras rows, o None si no hay vn.
+        Las esquinas sin vn usan la normal geométrica de su cara.
+        """
+        if not self.smooth or len(self.normals) == 0:
+            return None
+        idx = self.face_normals[rows]
+        corners = self.normals[np.maximum(idx, 0)]
+        missing = idx < 0
+        if missing.any():
+            tri = vertices[self.faces[rows]]
+            flat = normalize_many(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]))
+            corners = np.where(missing[..., None], flat[:, None, :], corners)
+        return corners
+
+    def _corner_uvs(self, rows):
+        """
+        UV (K, 3, 2) por esquina de las caras rows, o None si no hay vt.
+        Las esquinas sin vt toman (0,0), (1,0), (0,1), que al interpolar
+        dan las baricéntricas como sin vt.
+        """
+        if not self.smooth or len(self.texcoords) == 0:
+            return None
+        idx = self.face_texcoords[rows]
+        corners = self.texcoords[np.maximum(idx, 0)]
+        missing = idx < 0
+        if missing.any():
+            default = np.array([[0, 0], [1, 0], [0, 1]], dtype=np.float32)
+            corners = np.where(missing[..., None], default, corners)
+        return corners
+
+    def _create_meshes(self):
+        """Genera un TriangleMesh por material; todos comparten el arreglo de vértices."""
+        vertices = np.asarray(self.vertices, dtype=np.float32).reshape(-1, 3)
+        for _, material, rows in self._groups():
+            self.meshes.append(TriangleMesh(vertices, self.faces[rows], material,
+                                            normals=self._corner_normals(vertices, rows),
+                                            uvs=self._corner_uvs(rows)))
+
+    def _create_triangles(self):
+        """Genera objetos Triangle (normal plana) a partir de las caras, usando materiales."""
+        vertices = np.asarray(self.vertices, dtype=np.float32).reshape(-1, 3)
+        for _, material, rows in self._groups():
+            for A, B, C in vertices[self.faces[rows]].tolist():
+                self.triangles.append(Triangle(A=A, B=B, C=C, material=material))
+
     def get_triangles(self):
-        """Retorna la lista de triángulos para agregar a la escena."""
-        return self.triangles
+        """Retorna la lista de figuras (mallas o triángulos) para agregar a la escena."""
+        return self.meshes if self.packed else self.triangles
 
 
-def load_obj(filepath, material=None, materials_dict=None, 
-             scale=1.0, position=(0, 0, 0), rotation=(0, 0, 0)):
+def load_obj(filepath, material=None, materials_dict=None,
+             scale=1.0, position=(0, 0, 0), rotation=(0, 0, 0), packed=True, cache=True, smooth=True):
     """
     Función helper para cargar un OBJ.
-    
+
     Args:
         filepath: Ruta al archivo .obj
         material: Material por defecto
@@ -271,14 +352,17 @@ def load_obj(filepath, material=None, materials_dict=None,
         scale: Escala (float o tuple de 3 valores)
         position: Posición (x, y, z)
         rotation: Rotación (rx, ry, rz) en grados
-    
+        packed: True -> un TriangleMesh por material; False -> un Triangle por cara
+        cache: True -> usa/crea la caché binaria en __meshcache__ junto al .obj
+        smooth: True -> normales y UV por vértice interpoladas (si el OBJ trae vn/vt)
+
     Returns:
-        Lista de triángulos
-    
+        Lista de figuras para extender rt.scene
+
     Ejemplos:
         # Uso básico con un solo material
         triangles = load_obj('model.obj', material=mat_default, scale=2.0)
-        
+
         # Uso con múltiples materiales
         triangles = load_obj(
             'tree.obj',
@@ -290,5 +374,18 @@ def load_obj(filepath, material=None, materials_dict=None,
             position=(0, 0, 0)
         )
     """
-    model = OBJModel(filepath, material, materials_dict, scale, position, rotation)
-    return model.get_triangles()
\ No newline at end of file
+    model = OBJModel(filepath, material, materials_dict, scale, position, rotation, packed, cache, smooth)
+    return model.get_triangles()
+
+def place_instances(shapes, position=(0, 0, 0), rotation=(0, 0, 0), scale=1.0, material=None):
+    """
+    Coloca figuras ya cargadas (p. ej. las mallas de load_obj) como
+    Instance: comparten vértices y BVH con las originales, así N árboles
+    ocupan la memoria de uno más una matriz por colocación.
+
+    Ejemplo:
+        arbol = load_obj('tree.obj', materials_dict={...}, scale=0.1)
+        for x in range(10):
+            rt.scene.extend(place_instances(arbol, position=(x, 0, -3), rotation=(0, 36 * x, 0)))
+    """
+    return [Instance.place(shape, position, rotation, scale, material) for shape in shapes]
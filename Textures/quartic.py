@@ -0,0 +1,147 @@
+"""
+Raíz real más pequeña de un polinomio cuártico dentro de un intervalo.
+
+Los puntos críticos (raíces de la derivada cúbica, forma cerrada) dividen
+[lo, hi] en tramos monótonos; el primer tramo con cambio de signo contiene
+la raíz buscada, que se refina con Newton protegido por bisección.
+Hay una versión escalar en floats de Python y una vectorizada para lotes.
+"""
+import math
+import numpy as np
+
+NEWTON_ITERS = 24
+TOL = 1e-10
+
+# Versión escalar
+def _horner(c, t):
+    return (((c[0] * t + c[1]) * t + c[2]) * t + c[3]) * t + c[4]
+
+def _horner_d(c, t):
+    return ((4.0 * c[0] * t + 3.0 * c[1]) * t + 2.0 * c[2]) * t + c[3]
+
+def _cubic_real_roots(a, b, c, d):
+    """Raíces reales de a t³ + b t² + c t + d (a != 0), forma cerrada."""
+    p2, p1, p0 = b / a, c / a, d / a
+    shift = p2 / 3.0
+    P = p1 - p2 * p2 / 3.0
+    Q = 2.0 * p2 * p2 * p2 / 27.0 - p2 * p1 / 3.0 + p0
+    disc = (Q * 0.5) ** 2 + (P / 3.0) ** 3
+
+    if disc > 0.0:
+        sq = math.sqrt(disc)
+        u = -Q * 0.5 + sq
+        v = -Q * 0.5 - sq
+        x = math.copysign(abs(u) ** (1.0 / 3.0), u) + math.copysign(abs(v) ** (1.0 / 3.0), v)
+        return [x - shift]
+    if P == 0.0:
+        return [-shift]
+    m = 2.0 * math.sqrt(-P / 3.0)
+    theta = math.acos(max(-1.0, min(1.0, 3.0 * Q / (P * m)))) / 3.0
+    return [m * math.cos(theta - 2.0 * math.pi * k / 3.0) - shift for k in range(3)]
+
+def first_root(coeffs, lo, hi):
+    """
+    coeffs: [a, b, c, d, e] de a t⁴ + b t³ + c t² + d t + e (a > 0).
+    Retorna la raíz más pequeña en [lo, hi] o None.
+    """
+    if hi < lo:
+        return None
+    c = [float(x) for x in coeffs]
+    crit = [t for t in _cubic_real_roots(4.0 * c[0], 3.0 * c[1], 2.0 * c[2], c[3]) if lo < t < hi]
+    pts = [lo] + sorted(crit) + [hi]
+
+    fa = _horner(c, pts[0])
+    for k in range(len(pts) - 1):
+        a, b = pts[k], pts[k + 1]
+        fb = _horner(c, b)
+        if fa == 0.0:
+            return a
+        if fa * fb <= 0.0:
+            return _refine(c, a, b, fa)
+        fa = fb
+    return None
+
+def _refine(c, a, b, fa):
+    x = 0.5 * (a + b)
+    for _ in range(NEWTON_ITERS):
+        fx = _horner(c, x)
+        if fx == 0.0:
+            return x
+        if (fx < 0.0) == (fa < 0.0):
+            a, fa = x, fx
+        else:
+            b = x
+        dfx = _horner_d(c, x)
+        xn = x - fx / dfx if dfx != 0.0 else 0.5 * (a + b)
+        if not (a < xn < b):
+            xn = 0.5 * (a + b)
+        if abs(xn - x) < TOL:
+            return xn
+        x = xn
+    return x
+
+# Versión vectorizada
+def _horner_many(c, t):
+    return (((c[:, 0] * t + c[:, 1]) * t + c[:, 2]) * t + c[:, 3]) * t + c[:, 4]
+
+def _horner_d_many(c, t):
+    return ((4.0 * c[:, 0] * t + 3.0 * c[:, 1]) * t + 2.0 * c[:, 2]) * t + c[:, 3]
+
+def _cubic_real_roots_many(a, b, c, d):
+    """Como _cubic_real_roots para arreglos; retorna (M, 3) con NaN donde no hay raíz."""
+    p2, p1, p0 = b / a, c / a, d / a
+    shift = p2 / 3.0
+    P = p1 - p2 * p2 / 3.0
+    Q = 2.0 * p2 * p2 * p2 / 27.0 - p2 * p1 / 3.0 + p0
+    disc = (Q * 0.5) ** 2 + (P / 3.0) ** 3
+
+    roots = np.full((len(a), 3), np.nan)
+    one = disc > 0.0
+    sq = np.sqrt(np.where(one, disc, 0.0))
+    roots[:, 0] = np.where(one, np.cbrt(-Q * 0.5 + sq) + np.cbrt(-Q * 0.5 - sq) - shift, np.nan)
+
+    three = ~one
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m = 2.0 * np.sqrt(np.maximum(-P / 3.0, 0.0))
+        theta = np.arccos(np.clip(3.0 * Q / (P * m), -1.0, 1.0)) / 3.0
+    triple = three & (m == 0.0)
+    for k in range(3):
+        r = m * np.cos(theta - 2.0 * np.pi * k / 3.0) - shift
+        roots[:, k] = np.where(three, np.where(triple, -shift, r), roots[:, k])
+    return roots
+
+def first_root_many(coeffs, lo, hi):
+    """
+    coeffs: (M, 5); lo, hi: (M,).
+    Retorna (M,) con la raíz más pequeña en [lo, hi] o inf.
+    """
+    c = np.asarray(coeffs, dtype=np.float64)
+    m = len(c)
+    crit = _cubic_real_roots_many(4.0 * c[:, 0], 3.0 * c[:, 1], 2.0 * c[:, 2], c[:, 3])
+    inside = (crit > lo[:, None]) & (crit < hi[:, None])
+    crit = np.where(inside, crit, hi[:, None])
+
+    pts = np.sort(np.concatenate([lo[:, None], crit, hi[:, None]], axis=1), axis=1)
+    f = np.stack([_horner_many(c, pts[:, k]) for k in range(5)], axis=1)
+
+    change = (f[:, :-1] * f[:, 1:] <= 0.0) & (hi >= lo)[:, None]
+    found = change.any(axis=1)
+    seg = np.argmax(change, axis=1)
+    rows = np.arange(m)
+    a = pts[rows, seg]; b = pts[rows, seg + 1]
+    fa = f[rows, seg]
+
+    x = 0.5 * (a + b)
+    for _ in range(NEWTON_ITERS):
+        fx = _horner_many(c, x)
+        same = (fx < 0.0) == (fa < 0.0)
+        a = np.where(same, x, a); fa = np.where(same, fx, fa)
+        b = np.where(same, b, x)
+        dfx = _horner_d_many(c, x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xn = x - fx / dfx
+        xn = np.where((xn > a) & (xn < b), xn, 0.5 * (a + b))
+        x = np.where(fx == 0.0, x, xn)
+
+    x = np.where(f[rows, seg] == 0.0, pts[rows, seg], x)
+    return np.where(found, x, np.inf)
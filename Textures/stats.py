@@ -0,0 +1,86 @@
+import time
+from collections import Counter, defaultdict
+
+class RenderStats:
+    """
+    Estadísticas opcionales del render (Raytracer.enable_stats()):
+    - rays:       rayos primarios, de sombra y de reflexión
+    - tests/hits: pruebas de intersección e impactos por tipo de figura
+    - depths:     rayos lanzados por cast_ray en cada profundidad
+    - phase_time: tiempo de pared exclusivo por fase (una fase anidada,
+                  p. ej. shadow dentro de shading, no se cuenta dos veces)
+
+    Con Raytracer.stats = None el render sólo paga una comparación con None
+    en cada punto de medición.
+    """
+    PHASES = ("primary", "reflection", "shadow", "shading", "background", "bmp_write")
+
+    def __init__(self):
+        self.rays = {"primary": 0, "shadow": 0, "reflection": 0}
+        self.tests = Counter()
+        self.hits = Counter()
+        self.depths = Counter()
+        self.phase_time = defaultdict(float)
+        self._stack = []
+        self._mark = 0.0
+
+    def ray(self, kind, depth=None, n=1):
+        self.rays[kind] += n
+        if depth is not None:
+            self.depths[depth] += n
+
+    def test(self, shape_type, n=1, hits=0):
+        self.tests[shape_type] += n
+        if hits:
+            self.hits[shape_type] += hits
+
+    def timed(self, phase, fn, *args):
+        """Llama fn(*args) acumulando su tiempo en phase (sin el de las fases anidadas)."""
+        now = time.perf_counter()
+        if self._stack:
+            self.phase_time[self._stack[-1]] += now - self._mark
+        self._stack.append(phase)
+        self._mark = now
+        try:
+            return fn(*args)
+        finally:
+            now = time.perf_counter()
+            self.phase_time[self._stack.pop()] += now - self._mark
+            self._mark = now
+
+    def merge(self, other):
+        """Suma las estadísticas de otro proceso (render multiproceso)."""
+        for kind, n in other.rays.items():
+            self.rays[kind] += n
+        self.tests.update(other.tests)
+        self.hits.update(other.hits)
+        self.depths.update(other.depths)
+        for phase, t in other.phase_time.items():
+            self.phase_time[phase] += t
+
+    def summary(self):
+        """Tabla de texto con todos los contadores."""
+        total_rays = sum(self.rays.values())
+        lines = ["Estadísticas de render",
+                 f"  Rayos: {total_rays}  (primarios {self.rays['primary']}, "
+                 f"sombra {self.rays['shadow']}, reflexión {self.rays['reflection']})",
+                 "",
+                 f"  {'Figura':<14}{'Pruebas':>12}{'Impactos':>12}{'Tasa':>8}"]
+        for shape_type, n in self.tests.most_common():
+            hits = self.hits[shape_type]
+            lines.append(f"  {shape_type:<14}{n:>12}{hits:>12}{hits / n:>8.1%}")
+
+        lines += ["", f"  {'Profundidad':<14}{'Rayos':>12}"]
+        for depth in sorted(self.depths):
+            lines.append(f"  {depth:<14}{self.depths[depth]:>12}")
+
+        total_time = sum(self.phase_time.values())
+        lines += ["", f"  {'Fase':<14}{'Tiempo (s)':>12}{'%':>8}"]
+        phases = [p for p in self.PHASES if p in self.phase_time]
+        phases += sorted(p for p in self.phase_time if p not in self.PHASES)
+        for phase in phases:
+            t = self.phase_time[phase]
+            lines.append(f"  {phase:<14}{t:>12.3f}{t / total_time if total_time else 0.0:>8.1%}")
+        if total_time > 0:
+            lines.append(f"  {'total':<14}{total_time:>12.3f}   ({total_rays / total_time:.0f} rayos/s)")
+        return "\n".join(lines)
@@ -1,18 +1,30 @@
 import numpy as np
-import pygame
+
+from Textures.assets import load_image, load_mipmap
 
 class ImageTexture:
-    def __init__(self, path):
-        surf = pygame.image.load(path)
-        arr = pygame.surfarray.pixels3d(surf).astype(np.float32) / 255.0
-        # pygame devuelve (W,H,3), convertimos a (H,W,3)
-        self.img = np.transpose(arr, (1, 0, 2)).copy()
-        self.h, self.w = self.img.shape[:2]
-
-    def sample(self, u, v):
+    """
+    Textura de imagen con repetición. La imagen se guarda como pirámide de
+    mips (MipMap, uint8 por defecto); lod elige el nivel: 0 es la imagen
+    completa y lod_for(footprint) lo calcula a partir de la huella del
+    rayo en unidades de UV. Con cache=True la pirámide sale de la caché
+    de assets (ver assets.py) y se comparte entre instancias y procesos.
+    """
+    def __init__(self, path, dtype=np.uint8, cache=True):
+        self.mips = load_mipmap(path, dtype, cache)
+        self.h, self.w = self.mips.h, self.mips.w
+
+    def lod_for(self, footprint):
+        """Nivel de detalle para una huella de footprint (fracción de la textura) por muestra."""
+        return self.mips.lod(np.asarray(footprint) * max(self.w, self.h))
+
+    def sample(self, u, v, lod=0.0):
         # repeat
         u = u % 1.0
         v = v % 1.0
+        if lod > 0.0:
+            return self.mips.sample(np.array([u]), np.array([v]), lod)[0]
+
         x = u * (self.w - 1)
         y = (1.0 - v) * (self.h - 1)
 
@@ -21,12 +33,18 @@ class ImageTexture:
 
         sx = x - x0; sy = y - y0
 
-        c00 = self.img[y0, x0]
-        c10 = self.img[y0, x1]
-        c01 = self.img[y1, x0]
-        c11 = self.img[y1, x1]
+        img = self.mips.levels[0]
+        c00 = self.mips.load(img[y0, x0])
+        c10 = self.mips.load(img[y0, x1])
+        c01 = self.mips.load(img[y1, x0])
+        c11 = self.mips.load(img[y1, x1])
 
         c0 = c00 * (1 - sx) + c10 * sx
         c1 = c01 * (1 - sx) + c11 * sx
         c  = c0 * (1 - sy) + c1 * sy
         return c
+
+    def sample_many(self, uv, lod=0.0):
+        """Colores (N,3) para coordenadas uv (N,2); lod es un número o un arreglo (N,)."""
+        uv = np.asarray(uv, dtype=np.float64) % 1.0
+        return self.mips.sample(uv[:, 0], uv[:, 1], lod)
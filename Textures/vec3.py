@@ -0,0 +1,121 @@
+"""
+Backend escalar de MathLib sin NumPy: vectores de 3 componentes como
+tuplas de floats (Vec3). Expone las mismas funciones que el camino por
+rayo usa de MathLib (normalize, dot, cross, length, reflect, refract).
+
+Se activa con RT_MATH_BACKEND=float; ver MathLib.scalar.
+"""
+import math
+import numpy as np
+
+EPS = 1e-8
+
+class Vec3(tuple):
+    """
+    Vector 3D inmutable sobre una tupla de floats.
+    Opera con otros Vec3/tuplas y con escalares sin pasar por NumPy;
+    con un ndarray delega en NumPy (el resultado es un ndarray).
+    """
+    __slots__ = ()
+
+    def __new__(cls, x, y, z):
+        return tuple.__new__(cls, (x, y, z))
+
+    def __add__(self, o):
+        if isinstance(o, tuple):
+            return Vec3(self[0] + o[0], self[1] + o[1], self[2] + o[2])
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, o):
+        if isinstance(o, tuple):
+            return Vec3(self[0] - o[0], self[1] - o[1], self[2] - o[2])
+        return NotImplemented
+
+    def __rsub__(self, o):
+        if isinstance(o, tuple):
+            return Vec3(o[0] - self[0], o[1] - self[1], o[2] - self[2])
+        return NotImplemented
+
+    def __mul__(self, s):
+        if isinstance(s, tuple):
+            return Vec3(self[0] * s[0], self[1] * s[1], self[2] * s[2])
+        if isinstance(s, np.ndarray) and s.ndim:
+            return NotImplemented
+        s = float(s)
+        return Vec3(self[0] * s, self[1] * s, self[2] * s)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, s):
+        if isinstance(s, np.ndarray) and s.ndim:
+            return NotImplemented
+        s = 1.0 / float(s)
+        return Vec3(self[0] * s, self[1] * s, self[2] * s)
+
+    def __neg__(self):
+        return Vec3(-self[0], -self[1], -self[2])
+
+    def __repr__(self):
+        return f"Vec3({self[0]:.6g}, {self[1]:.6g}, {self[2]:.6g})"
+
+def _xyz(v):
+    """Componentes como floats de Python, venga v como Vec3, tupla o ndarray."""
+    if type(v) is Vec3:
+        return v
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    return (float(v[0]), float(v[1]), float(v[2]))
+
+def length(v):
+    """Magnitud de un vector."""
+    x, y, z = _xyz(v)
+    return math.sqrt(x * x + y * y + z * z)
+
+def normalize(v):
+    """Normaliza un vector. Si es vector cero, retorna vector cero."""
+    x, y, z = _xyz(v)
+    n = math.sqrt(x * x + y * y + z * z)
+    if n < EPS:
+        return Vec3(0.0, 0.0, 0.0)
+    inv = 1.0 / n
+    return Vec3(x * inv, y * inv, z * inv)
+
+def dot(a, b):
+    """Producto punto entre dos vectores."""
+    ax, ay, az = _xyz(a)
+    bx, by, bz = _xyz(b)
+    return ax * bx + ay * by + az * bz
+
+def cross(a, b):
+    """Producto cruz entre dos vectores."""
+    ax, ay, az = _xyz(a)
+    bx, by, bz = _xyz(b)
+    return Vec3(ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx)
+
+def reflect(I, N):
+    """
+    Refleja el vector incidente I respecto a la normal N: R = I - 2(I·N)N.
+    I y N se normalizan una vez; con ambos unitarios R ya es unitario.
+    """
+    I = normalize(I)
+    N = normalize(N)
+    k = 2.0 * (I[0] * N[0] + I[1] * N[1] + I[2] * N[2])
+    return Vec3(I[0] - k * N[0], I[1] - k * N[1], I[2] - k * N[2])
+
+def refract(I, N, eta_ratio):
+    """
+    Refracción con la ley de Snell. Retorna el vector refractado
+    normalizado o None si hay reflexión total interna.
+    """
+    I = normalize(I)
+    N = normalize(N)
+    cosi = max(-1.0, min(1.0, -(I[0] * N[0] + I[1] * N[1] + I[2] * N[2])))
+    k = 1.0 - eta_ratio * eta_ratio * (1.0 - cosi * cosi)
+    if k < 0:
+        return None
+    a = eta_ratio * cosi - math.sqrt(k)
+    return normalize(Vec3(eta_ratio * I[0] + a * N[0],
+                          eta_ratio * I[1] + a * N[1],
+                          eta_ratio * I[2] + a * N[2]))
@@ -0,0 +1,106 @@
+"""
+Asignaciones por rayo en scene_intersect: protocolo anterior (un Intercept
+por figura impactada) frente al de dos fases (hit() + surface() sólo para
+la ganadora). Mide Intercepts construidos y el pico de tracemalloc por rayo
+para escenas de distinto tamaño, sin BVH para que todas las figuras se prueben.
+
+    python bench/bench_alloc.py [rayos]
+"""
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.gl import Raytracer, EPS
+from Textures.figures import Sphere, Cube, Ellipsoid, Cylinder, Torus, Plane
+from Textures.intercept import Intercept
+from Textures.material import Material
+from Textures.MathLib import normalize_many
+
+def legacy_scene_intersect(rt, orig, direction):
+    """scene_intersect anterior: ray_intersect (con Intercept) en cada figura."""
+    nearest = None
+    min_dist = np.inf
+    for obj in rt.scene:
+        h = obj.ray_intersect(orig, direction)
+        if h is not None and EPS < h.distance < min_dist:
+            nearest = h
+            min_dist = h.distance
+    return nearest
+
+def make_scene(n_objects, seed=0):
+    """Figuras alineadas a lo largo del eje -Z para que un rayo cruce muchas."""
+    rng = np.random.default_rng(seed)
+    m = Material()
+    kinds = (
+        lambda p: Sphere(p, 0.4, m),
+        lambda p: Cube(p - 0.3, p + 0.3, m),
+        lambda p: Ellipsoid(p, (0.4, 0.3, 0.5), m),
+        lambda p: Cylinder(p, 0.3, 0.6, m),
+        lambda p: Torus(p, 0.35, 0.12, m),
+    )
+    rt = Raytracer(8, 8)
+    rt.scene.append(Plane((0, -2, 0), (0, 1, 0), m))
+    for k in range(n_objects - 1):
+        p = np.array([rng.uniform(-0.1, 0.1), rng.uniform(-0.1, 0.1), -2.0 - 1.5 * k])
+        rt.scene.append(kinds[k % len(kinds)](p))
+    return rt
+
+def make_rays(n, seed=1):
+    rng = np.random.default_rng(seed)
+    d = normalize_many(np.column_stack([rng.uniform(-0.05, 0.05, n),
+                                        rng.uniform(-0.05, 0.05, n),
+                                        -np.ones(n)]))
+    return np.zeros(3, dtype=np.float32), d.astype(np.float32)
+
+class InterceptCounter:
+    """Cuenta las construcciones de Intercept mientras está activo."""
+    def __enter__(self):
+        self.count = 0
+        self._init = Intercept.__init__
+        counter = self
+
+        def counting_init(self_, *args, **kwargs):
+            counter.count += 1
+            counter._init(self_, *args, **kwargs)
+
+        Intercept.__init__ = counting_init
+        return self
+
+    def __exit__(self, *exc):
+        Intercept.__init__ = self._init
+
+def measure(fn, orig, dirs):
+    with InterceptCounter() as counter:
+        t = time.perf_counter()
+        for d in dirs:
+            fn(orig, d)
+        elapsed = time.perf_counter() - t
+
+    peaks = []
+    tracemalloc.start()
+    for d in dirs[:200]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(orig, d)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    n = len(dirs)
+    return counter.count / n, float(np.mean(peaks)), elapsed / n * 1e6
+
+def main(n_rays=500):
+    orig, dirs = make_rays(n_rays)
+    print(f"{'figuras':>8} | {'protocolo':>10} | {'Intercept/rayo':>14} | {'pico B/rayo':>11} | {'us/rayo':>8}")
+    for n_objects in (8, 32, 128):
+        rt = make_scene(n_objects)
+        rows = (("anterior", lambda o, d: legacy_scene_intersect(rt, o, d)),
+                ("dos fases", rt.scene_intersect))
+        for name, fn in rows:
+            per_ray, peak, us = measure(fn, orig, dirs)
+            print(f"{n_objects:>8} | {name:>10} | {per_ray:>14.2f} | {peak:>11.0f} | {us:>8.1f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
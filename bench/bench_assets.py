@@ -0,0 +1,52 @@
+"""
+Caché de assets: cargar una textura decodificando la imagen, desde el LRU
+del proceso (ASSETS) y desde __texcache__ con mmap (lo que hace un proceso
+nuevo o un worker de render_parallel), y el tamaño del pickle de un EnvMap
+con y sin caché.
+
+    python bench/bench_assets.py [ancho] [alto]
+"""
+import contextlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BMP.BMP_Writer import save as save_bmp
+from Textures.assets import ASSETS
+from Textures.envmap import EnvMap
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t, out
+
+def main(width=4096, height=2048):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "env.bmp")
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_bmp(path, width, height, rng.random((height, width, 3), dtype=np.float32))
+
+        t_decode, plain = timed(lambda: EnvMap(path, cache=False))
+        t_first, _ = timed(lambda: EnvMap(path))
+        t_memory, _ = timed(lambda: EnvMap(path))
+        ASSETS.clear()
+        t_disk, cached = timed(lambda: EnvMap(path))
+
+        print(f"Env map {width}x{height}: mips {cached.mips.nbytes / 1e6:.1f} MB")
+        print(f"  decodificar (sin caché):        {t_decode * 1e3:9.2f} ms")
+        print(f"  primera carga + __texcache__:   {t_first * 1e3:9.2f} ms")
+        print(f"  desde ASSETS (mismo proceso):   {t_memory * 1e3:9.2f} ms")
+        print(f"  desde __texcache__ (mmap):      {t_disk * 1e3:9.2f} ms")
+        print(f"  pickle: {len(pickle.dumps(plain)) / 1e6:.1f} MB sin caché, "
+              f"{len(pickle.dumps(cached))} bytes con caché")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,59 @@
+"""
+Consulta del env map: sample() dirección por dirección (como el render
+anterior de los rayos que no pegan) frente a sample_many() equirectangular
+y a la LUT octaédrica (build_lut). Usa un cielo sintético si no se da un
+archivo.
+
+    python bench/bench_envmap.py [env.bmp] [rayos]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BMP.BMP_Writer import save as save_bmp
+from Textures.envmap import EnvMap
+
+def synthetic_sky(path, w=1024, h=512):
+    yy, xx = np.mgrid[0:h, 0:w] / np.array([h, w])[:, None, None]
+    img = np.stack([0.5 + 0.5 * np.sin(6 * np.pi * xx), 1.0 - yy, 0.5 + 0.5 * np.cos(4 * np.pi * yy)], axis=-1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_bmp(path, w, h, img.astype(np.float32))
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t, out
+
+def main(path=None, n_rays=200000):
+    rng = np.random.default_rng(0)
+    dirs = rng.normal(size=(n_rays, 3))
+    dirs /= np.linalg.norm(dirs, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = os.path.join(tmp, "sky.bmp")
+            synthetic_sky(path)
+        env = EnvMap(path)
+
+    n_scalar = min(n_rays, 20000)
+    t_scalar, _ = timed(lambda: [env.sample(d) for d in dirs[:n_scalar]])
+    t_scalar *= n_rays / n_scalar
+    t_many, exact = timed(lambda: env.sample_many(dirs))
+    t_build, _ = timed(lambda: env.build_lut(2 * env.w))
+    t_lut, approx = timed(lambda: env.sample_many(dirs))
+    err = np.abs(approx - exact).max(axis=1)
+
+    print(f"Env map {env.w}x{env.h}, {n_rays} direcciones")
+    print(f"  sample() por dirección:  {t_scalar:8.3f} s (estimado de {n_scalar})")
+    print(f"  sample_many():           {t_many:8.3f} s  x{t_scalar / t_many:.0f}")
+    print(f"  LUT {env.lut.shape[0]}x{env.lut.shape[0]}:           {t_lut:8.3f} s  x{t_scalar / t_lut:.0f}"
+          f"  (construcción {t_build:.2f} s, error medio {err.mean():.4f})")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, int(sys.argv[2]) if len(sys.argv) > 2 else 200000)
@@ -0,0 +1,84 @@
+"""
+Instancing: N árboles como copias horneadas (load_obj con su propia
+posición/rotación/escala, una malla y un BVH por copia) frente a N
+Instance de una sola malla. Mide memoria retenida (tracemalloc), tiempo
+de construcción (incluye build_accel) y tiempo de render en modo packet,
+y verifica que ambas escenas producen la misma imagen.
+
+    python bench/bench_instancing.py [árboles] [ancho] [alto]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from Textures.gl import Raytracer
+from Textures.figures import Plane
+from Textures.material import Material
+from Textures.obj_loader import load_obj, place_instances
+from scenes import TREE_OBJ, _lights
+
+def placements(count, seed=7):
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(count)))
+    for k in range(count):
+        position = ((k % side - (side - 1) / 2) * 1.8, 0.0, -(k // side) * 1.8)
+        yield position, (0.0, rng.uniform(0, 360), 0.0), rng.uniform(0.7, 1.2)
+
+def build(rt, count, instanced):
+    """Llena rt con count árboles; retorna (segundos, bytes retenidos)."""
+    materials = {"Bark": Material(color=(0.45, 0.3, 0.2), kd=0.85, ks=0.1, shininess=20),
+                 "Tree": Material(color=(0.3, 0.6, 0.3), kd=0.8, ks=0.2, shininess=60)}
+    path = os.path.join(ROOT, TREE_OBJ)
+    load_obj(path, materials_dict=materials)  # llena la caché de mallas antes de medir
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rt.scene = [Plane(position=(0, -1.0, 0), normal=(0, 1, 0),
+                      material=Material(color=(0.8, 0.75, 0.7), kd=0.8, ks=0.2, shininess=40))]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if instanced:
+            meshes = load_obj(path, materials_dict=materials, scale=0.1)
+            for position, rotation, scale in placements(count):
+                rt.scene.extend(place_instances(meshes, position, rotation, scale))
+        else:
+            for position, rotation, scale in placements(count):
+                rt.scene.extend(load_obj(path, materials_dict=materials, scale=0.1 * scale,
+                                         position=position, rotation=rotation))
+    rt.build_accel()
+    elapsed = time.perf_counter() - t0
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained
+
+def main(count=100, width=96, height=120):
+    results = {}
+    for name, instanced in (("copias", False), ("instancias", True)):
+        rt = Raytracer(width, height)
+        rt.eye = np.array([0.0, 2.0, 9.0], dtype=np.float32)
+        rt.fov = 50.0
+        rt.max_depth = 2
+        rt.envmap = None
+        rt.lights = _lights()
+        t_build, mem = build(rt, count, instanced)
+        t0 = time.perf_counter()
+        rt.render(mode="packet")
+        results[name] = (t_build, mem, time.perf_counter() - t0, rt.framebuffer.copy())
+
+    print(f"{count} árboles, {width}x{height} packet")
+    print(f"  {'':<12}{'construcción':>14}{'memoria':>12}{'render':>10}")
+    for name, (t_build, mem, t_render, _) in results.items():
+        print(f"  {name:<12}{t_build:>12.3f} s{mem / 1e6:>9.2f} MB{t_render:>8.2f} s")
+    diff = np.abs(results["copias"][3] - results["instancias"][3]).max()
+    print(f"  diferencia máxima entre imágenes: {diff:.2e}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
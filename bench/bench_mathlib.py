@@ -0,0 +1,50 @@
+"""
+Micro-benchmark por función de los dos backends escalares de MathLib:
+numpy (MathLib) y float (Textures/vec3.py, tuplas Vec3).
+Cada backend se mide con sus entradas nativas y el backend float también
+con ndarrays de entrada (como llegan desde Intercept).
+
+    python bench/bench_mathlib.py [repeticiones]
+"""
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures import MathLib
+from Textures import vec3
+
+CASES = (
+    ("normalize", lambda m, a, b: m.normalize(a)),
+    ("dot",       lambda m, a, b: m.dot(a, b)),
+    ("cross",     lambda m, a, b: m.cross(a, b)),
+    ("length",    lambda m, a, b: m.length(a)),
+    ("reflect",   lambda m, a, b: m.reflect(a, b)),
+    ("refract",   lambda m, a, b: m.refract(a, b, 1.0 / 1.5)),
+)
+
+def per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+def main(number=20000):
+    a_np = np.array([0.3, -0.5, 0.8], dtype=np.float32)
+    b_np = MathLib.normalize(np.array([0.1, 1.0, 0.2], dtype=np.float32))
+    a_v = vec3.Vec3(*a_np.tolist())
+    b_v = vec3.Vec3(*b_np.tolist())
+
+    print(f"{'función':>10} | {'numpy us':>9} | {'float us':>9} | {'float(ndarray) us':>17} | {'x':>5}")
+    for name, call in CASES:
+        t_np = per_call_us(lambda: call(MathLib, a_np, b_np), number)
+        t_f = per_call_us(lambda: call(vec3, a_v, b_v), number)
+        t_mix = per_call_us(lambda: call(vec3, a_np, b_np), number)
+
+        ref = np.asarray(call(MathLib, a_np, b_np), dtype=np.float64)
+        got = np.asarray(call(vec3, a_v, b_v), dtype=np.float64)
+        assert np.allclose(ref, got, atol=1e-6), name
+
+        print(f"{name:>10} | {t_np:>9.2f} | {t_f:>9.2f} | {t_mix:>17.2f} | {t_np / t_f:>5.1f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
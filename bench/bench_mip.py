@@ -0,0 +1,56 @@
+"""
+Mips: memoria de la pirámide (uint8 / float16) frente a la imagen en
+float32, y muestreo minificado (muestras dispersas, como un piso lejano o
+un reflejo) en el nivel 0 frente al nivel que da la huella de cada
+muestra. El error se mide contra el promedio exacto de la huella.
+
+    python bench/bench_mip.py [lado de la textura] [muestras]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.mipmap import MipMap
+
+def synthetic_texture(side):
+    """Tablero fino con ruido: el peor caso para el aliasing."""
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:side, 0:side]
+    board = ((xx // 4 + yy // 4) % 2).astype(np.float32)
+    img = np.stack([board, 0.5 * board + 0.25, rng.random((side, side), dtype=np.float32)], axis=-1)
+    return img
+
+def main(side=2048, n=200000):
+    img = synthetic_texture(side)
+    rng = np.random.default_rng(1)
+    footprint = 64                      # texels de nivel 0 por muestra
+    u = rng.random(n); v = rng.random(n)
+
+    # Referencia: promedio de la huella de footprint x footprint texels
+    blocks = img.reshape(side // footprint, footprint, side // footprint, footprint, 3).mean(axis=(1, 3))
+    bx = np.minimum((u * (side - 1) / footprint).astype(int), side // footprint - 1)
+    by = np.minimum(((1 - v) * (side - 1) / footprint).astype(int), side // footprint - 1)
+    exact = blocks[by, bx]
+
+    print(f"Textura {side}x{side}: float32 {img.nbytes / 1e6:.1f} MB")
+    for dtype in (np.uint8, np.float16):
+        t = time.perf_counter()
+        mips = MipMap(img, dtype)
+        build = time.perf_counter() - t
+        print(f"  mips {np.dtype(dtype).name:<8} {mips.nbytes / 1e6:6.1f} MB  x{img.nbytes / mips.nbytes:.1f} menos"
+              f"  ({len(mips.levels)} niveles, {build:.2f} s)")
+
+        lod = float(mips.lod(footprint))
+        for name, level in (("nivel 0", 0.0), (f"lod {lod:.0f}", lod)):
+            t = time.perf_counter()
+            color = mips.sample(u, v, level)
+            elapsed = time.perf_counter() - t
+            err = np.abs(color - exact).mean()
+            print(f"    {name:<8} {elapsed * 1e3:7.1f} ms  error frente a la huella {err:.3f}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
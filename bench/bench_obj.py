@@ -0,0 +1,89 @@
+"""
+Benchmark de carga de OBJ: parser línea por línea anterior frente al
+parseo en bloque (parse_obj) y a la caché binaria con mmap
+(load_obj_arrays). Usa una grilla sintética con v/vt/vn y quads.
+
+    python bench/bench_obj.py [lado de la grilla]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.obj_loader import parse_obj, load_obj_arrays, CACHE_DIR
+
+def legacy_parse(path):
+    """Parseo original: un np.array por vértice y un dict por cara."""
+    vertices, normals, faces = [], [], {}
+    current = "default"
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('v '):
+                p = line.split()
+                vertices.append(np.array([float(p[1]), float(p[2]), float(p[3])], dtype=np.float32))
+            elif line.startswith('vn '):
+                p = line.split()
+                n = np.array([float(p[1]), float(p[2]), float(p[3])], dtype=np.float32)
+                normals.append(n / np.linalg.norm(n))
+            elif line.startswith('usemtl '):
+                current = line.split()[1]
+                faces.setdefault(current, [])
+            elif line.startswith('f '):
+                idx = [int(c.split('/')[0]) - 1 for c in line.split()[1:]]
+                group = faces.setdefault(current, [])
+                for i in range(1, len(idx) - 1):
+                    group.append({'vertices': [idx[0], idx[i], idx[i + 1]]})
+    return vertices, normals, faces
+
+def write_grid(path, side):
+    """Grilla side x side de quads en dos materiales."""
+    u, v = np.meshgrid(np.linspace(0, 1, side + 1), np.linspace(0, 1, side + 1))
+    u = u.ravel(); v = v.ravel()
+    y = 0.1 * np.sin(6 * u) * np.cos(6 * v)
+    with open(path, "w") as f:
+        f.writelines(f"v {a:.6f} {b:.6f} {c:.6f}\n" for a, b, c in zip(u, y, v))
+        f.writelines(f"vt {a:.6f} {b:.6f}\n" for a, b in zip(u, v))
+        f.write("vn 0 1 0\n")
+        i, j = np.meshgrid(np.arange(side), np.arange(side))
+        a = (j * (side + 1) + i).ravel() + 1
+        quads = np.stack([a, a + 1, a + side + 2, a + side + 1], axis=1)
+        half = len(quads) // 2
+        for name, block in (("A", quads[:half]), ("B", quads[half:])):
+            f.write(f"usemtl {name}\n")
+            f.writelines("f " + " ".join(f"{k}/{k}/1" for k in q) + "\n" for q in block.tolist())
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t, out
+
+def main(side=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "grid.obj")
+        write_grid(path, side)
+        size_mb = os.path.getsize(path) / 1e6
+
+        t_legacy, _ = timed(lambda: legacy_parse(path))
+        with open(path) as f:
+            text = f.read()
+        t_bulk, arrays = timed(lambda: parse_obj(text))
+        t_first, _ = timed(lambda: load_obj_arrays(path))
+        t_cached, (cached, hit) = timed(lambda: load_obj_arrays(path))
+        assert hit and all(np.array_equal(arrays[k], cached[k]) for k in arrays)
+        cache_mb = sum(os.path.getsize(os.path.join(root, name))
+                       for root, _, names in os.walk(os.path.join(tmp, CACHE_DIR)) for name in names) / 1e6
+
+    print(f"OBJ: {size_mb:.1f} MB, {len(arrays['vertices'])} vértices, {len(arrays['faces'])} triángulos")
+    print(f"  línea por línea:        {t_legacy:8.3f} s")
+    print(f"  parse_obj (en bloque):  {t_bulk:8.3f} s  x{t_legacy / t_bulk:.1f}")
+    print(f"  primera carga + caché:  {t_first:8.3f} s  ({cache_mb:.1f} MB en {CACHE_DIR})")
+    print(f"  carga desde la caché:   {t_cached:8.3f} s  x{t_legacy / t_cached:.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,149 @@
+"""
+Benchmark reproducible del render con tiempos por etapa.
+
+Renderiza un conjunto fijo de escenas (bench/scenes.py) a varias
+resoluciones más un barrido de max_depth sobre la escena final, y reporta
+en JSON rayos/s, tiempo por etapa (primary, shadow, reflection, shading,
+background, bmp_write), pruebas por tipo de figura y pico de RSS. Cada caso corre en un proceso nuevo para que
+el RSS y los tiempos no se contaminen entre casos. No inicializa pygame.
+
+    python bench/bench_render.py --res 40x50 80x100 --out bench.json
+    python bench/bench_render.py --scenes torus --depths --mode packet
+
+Los contadores y tiempos vienen de Raytracer.enable_stats()
+(Textures/stats.py). Son exclusivos: shading no incluye los rayos de
+sombra ni de reflexión que lanza; "other" es el resto (generación de
+rayos y bucles del render).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_RES = ("40x50", "80x100")
+DEFAULT_DEPTHS = (0, 1, 2, 3, 4)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+def run_case(case):
+    """Renderiza un caso en este proceso y retorna su resultado."""
+    os.chdir(ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "bench"))
+    from scenes import SCENES
+    from BMP.BMP_Writer import save as save_bmp
+    from Textures.gl import Raytracer
+    from Textures.stats import RenderStats
+
+    w, h = case["width"], case["height"]
+    rt = Raytracer(w, h)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        SCENES[case["scene"]](rt)
+        if case.get("max_depth") is not None:
+            rt.max_depth = case["max_depth"]
+        rt.build_accel()
+        t_setup = time.perf_counter() - t0
+
+        stats = rt.enable_stats()
+        t0 = time.perf_counter()
+        rt.render(mode=case["mode"])
+        t_render = time.perf_counter() - t0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            stats.timed("bmp_write", save_bmp, os.path.join(tmp, "bench.bmp"), w, h, rt.framebuffer)
+
+    stages = {phase: stats.phase_time.get(phase, 0.0) for phase in RenderStats.PHASES}
+    stages["other"] = max(0.0, t_render - sum(v for k, v in stages.items() if k != "bmp_write"))
+    rays = sum(stats.rays.values())
+    return dict(case,
+                objects=len(rt.scene),
+                max_depth=rt.max_depth,
+                setup_time=t_setup,
+                render_time=t_render,
+                rays=dict(stats.rays, total=rays),
+                rays_per_sec=rays / t_render if t_render > 0 else 0.0,
+                stages=stages,
+                tests={k: {"tests": n, "hits": stats.hits[k]} for k, n in stats.tests.items()},
+                depths={str(d): n for d, n in sorted(stats.depths.items())},
+                peak_rss_mb=peak_rss_mb())
+
+def build_cases(args):
+    cases = []
+    for res in args.res:
+        w, h = (int(x) for x in res.lower().split("x"))
+        for scene in args.scenes:
+            cases.append({"scene": scene, "width": w, "height": h, "mode": args.mode, "max_depth": None})
+    if args.depths:
+        w, h = (int(x) for x in args.res[0].lower().split("x"))
+        for depth in args.depths:
+            cases.append({"scene": "final", "width": w, "height": h, "mode": args.mode, "max_depth": depth,
+                          "sweep": "max_depth"})
+    return cases
+
+def metadata():
+    import numpy as np
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "math_backend": os.environ.get("RT_MATH_BACKEND", "numpy"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--res", nargs="+", default=list(DEFAULT_RES), help="resoluciones WxH")
+    parser.add_argument("--scenes", nargs="+", default=["final", "trees", "torus"])
+    parser.add_argument("--depths", nargs="*", type=int, default=list(DEFAULT_DEPTHS),
+                        help="barrido de max_depth sobre la escena final, a la primera resolución "
+                             "(--depths sin valores lo desactiva)")
+    parser.add_argument("--mode", default="scalar", choices=("scalar", "packet"))
+    parser.add_argument("--out", help="archivo JSON de salida (por defecto stdout)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    results = []
+    for case in build_cases(args):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            raise SystemExit(f"falló el caso {case}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{result['scene']:>6} {result['width']}x{result['height']} depth={result['max_depth']}: "
+              f"{result['render_time']:.2f} s, {result['rays_per_sec']:.0f} rayos/s, "
+              f"RSS {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+
+    report = json.dumps({"meta": metadata(), "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
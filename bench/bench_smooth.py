@@ -0,0 +1,86 @@
+"""
+Sombreado suave: una esfera UV de pocos triángulos con normales por
+vértice (vn) frente a la misma malla con normal por cara y a una versión
+4x más densa. Mide el error angular de la normal respecto a la esfera
+analítica y el tiempo de intersección de un paquete de rayos.
+
+    python bench/bench_smooth.py [anillos] [rayos]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.obj_loader import load_obj
+from Textures.material import Material
+
+def write_sphere(path, rings):
+    """Esfera UV unitaria con rings anillos y 2*rings segmentos, con vt y vn."""
+    segments = 2 * rings
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, rings + 1), np.linspace(0, 2 * np.pi, segments + 1), indexing="ij")
+    p = np.stack([np.sin(theta) * np.cos(phi), np.cos(theta), np.sin(theta) * np.sin(phi)], axis=-1).reshape(-1, 3)
+    uv = np.stack([phi / (2 * np.pi), 1 - theta / np.pi], axis=-1).reshape(-1, 2)
+    with open(path, "w") as f:
+        f.writelines(f"v {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in p)
+        f.writelines(f"vt {u:.6f} {v:.6f}\n" for u, v in uv)
+        f.writelines(f"vn {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in p)
+        for i in range(rings):
+            for j in range(segments):
+                a = i * (segments + 1) + j + 1
+                b, c, d = a + segments + 1, a + segments + 2, a + 1
+                f.write(f"f {a}/{a}/{a} {d}/{d}/{d} {c}/{c}/{c} {b}/{b}/{b}\n")
+
+def sphere_normals(origins, directions):
+    """Normal de la esfera unitaria analítica en el primer impacto de cada rayo (nan si no impacta)."""
+    b = np.sum(origins * directions, axis=1)
+    c = np.sum(origins * origins, axis=1) - 1.0
+    disc = b * b - c
+    t = np.where(disc >= 0.0, -b - np.sqrt(np.abs(disc)), np.nan)
+    return origins + directions * t[:, None]
+
+def measure(mesh, origins, directions, repeats=5):
+    """(segundos por paquete, error angular medio y percentil 95 en grados
+    respecto a la esfera analítica, sobre los rayos que impactan ambas)."""
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        t, normals, _ = mesh.intersect_many(origins, directions)
+    elapsed = (time.perf_counter() - t0) / repeats
+
+    exact = sphere_normals(origins, directions)
+    hit = np.isfinite(t) & np.isfinite(exact[:, 0])
+    exact = exact[hit]
+    angle = np.degrees(np.arccos(np.clip(np.sum(normals[hit] * exact, axis=1), -1.0, 1.0)))
+    return elapsed, angle.mean(), np.percentile(angle, 95)
+
+def main(rings=8, n_rays=20000):
+    rng = np.random.default_rng(0)
+    origins = np.tile([0.0, 0.0, 4.0], (n_rays, 1))
+    targets = np.column_stack([rng.uniform(-0.9, 0.9, (n_rays, 2)), np.zeros(n_rays)])
+    directions = targets - origins
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+
+    m = Material()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        coarse, dense = os.path.join(tmp, "coarse.obj"), os.path.join(tmp, "dense.obj")
+        write_sphere(coarse, rings)
+        write_sphere(dense, 2 * rings)
+        cases = {
+            "pocas caras, plana": load_obj(coarse, material=m, smooth=False, cache=False)[0],
+            "pocas caras, suave": load_obj(coarse, material=m, cache=False)[0],
+            "4x caras, plana": load_obj(dense, material=m, smooth=False, cache=False)[0],
+        }
+
+    print(f"Esfera UV: {rings} anillos, {n_rays} rayos")
+    print(f"  {'':<22}{'caras':>7}{'intersección':>15}{'error medio':>13}{'p95':>9}")
+    for name, mesh in cases.items():
+        elapsed, mean, worst = measure(mesh, origins, directions)
+        print(f"  {name:<22}{len(mesh.faces):>7}{elapsed * 1e3:>12.1f} ms{mean:>11.2f}°{worst:>8.2f}°")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
@@ -0,0 +1,64 @@
+"""
+Benchmark de intersección con el Torus: solver cuártico propio
+(Textures/quartic.py) frente a la versión anterior con np.roots.
+
+    python bench/bench_torus.py [N]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.figures import Torus, EPS
+from Textures.material import Material
+from Textures.MathLib import normalize_many
+
+def roots_reference(torus, orig, dir):
+    """Intersección original: np.roots sin rechazo previo."""
+    ox, oy, oz = orig - torus.position
+    coeffs = torus._coeffs(ox, oy, oz, *dir)
+    roots = np.roots(coeffs)
+    valid = [r.real for r in roots if abs(r.imag) < EPS and r.real > EPS]
+    return min(valid) if valid else None
+
+def make_rays(torus, n, seed=0):
+    """Mitad de los rayos apuntan al toro, la otra mitad en direcciones al azar."""
+    rng = np.random.default_rng(seed)
+    origins = torus.position + rng.uniform(-6.0, 6.0, (n, 3))
+    phi = rng.uniform(0.0, 2.0 * np.pi, n)
+    targets = torus.position + np.stack([np.cos(phi), np.zeros(n), np.sin(phi)], axis=1) * torus.R
+    directions = normalize_many(targets - origins)
+    directions[n // 2:] = normalize_many(rng.normal(size=(n - n // 2, 3)))
+    return origins, directions
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t, out
+
+def main(n=20000):
+    torus = Torus((0.0, 0.0, -3.0), 1.0, 0.3, Material())
+    origins, directions = make_rays(torus, n)
+
+    t_ref, ref = timed(lambda: [roots_reference(torus, o, d) for o, d in zip(origins, directions)])
+    t_scalar, scalar = timed(lambda: [torus.ray_intersect(o, d) for o, d in zip(origins, directions)])
+    t_many, (t_hits, _, _) = timed(lambda: torus.intersect_many(origins, directions))
+
+    ref = np.array([np.inf if r is None else r for r in ref])
+    scalar = np.array([np.inf if h is None else h.distance for h in scalar])
+    hits = np.isfinite(ref)
+
+    print(f"Rayos: {n}  impactos: {int(hits.sum())}")
+    print(f"  np.roots (escalar):     {t_ref:8.3f} s")
+    print(f"  solver propio (escalar):{t_scalar:8.3f} s  x{t_ref / t_scalar:.1f}")
+    print(f"  solver propio (lotes):  {t_many:8.3f} s  x{t_ref / t_many:.1f}")
+    for name, t in (("escalar", scalar), ("lotes", t_hits)):
+        same = np.isfinite(t) == hits
+        err = np.abs(t[hits & np.isfinite(t)] - ref[hits & np.isfinite(t)])
+        print(f"  {name}: coincidencia de impactos {same.mean() * 100:.2f}%  "
+              f"error máx. {err.max() if len(err) else 0.0:.2e}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,64 @@
+"""
+Integrador wavefront: una caja de espejos (dos placas enfrentadas y
+esferas reflectantes) renderizada con max_depth de 1 a 8. Por cada
+profundidad máxima reporta el tiempo del render por paquetes, el pico de
+memoria (tracemalloc) y el tamaño de la cola de rayos en cada rebote, que
+se achica a medida que los rayos escapan de la caja.
+
+    python bench/bench_wavefront.py [ancho] [alto] [max_depth]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.gl import Raytracer
+from Textures.figures import Cube, Plane, Sphere
+from Textures.material import Material
+from Textures.lights import AmbientLight, PointLight
+
+def mirror_box(rt):
+    rt.eye = np.array([0.0, 0.0, 5.0], dtype=np.float32)
+    rt.fov = 50.0
+    rt.envmap = None
+    mirror = Material(color=(0.9, 0.9, 0.95), kd=0.1, ks=0.9, shininess=200)
+    rt.scene = [
+        Cube((-2.1, -1.2, -4.0), (-2.0, 1.5, 2.0), mirror),
+        Cube((2.0, -1.2, -4.0), (2.1, 1.5, 2.0), mirror),
+        Plane(position=(0, -1.2, 0), normal=(0, 1, 0),
+              material=Material(color=(0.8, 0.75, 0.7), kd=0.9, ks=0.0, shininess=40)),
+        Sphere((-0.8, -0.4, 0.0), 0.7, Material(color=(0.8, 0.2, 0.2), kd=0.5, ks=0.6, shininess=80)),
+        Sphere((0.8, -0.4, -1.0), 0.7, Material(color=(0.2, 0.4, 0.8), kd=0.5, ks=0.6, shininess=80)),
+    ]
+    rt.lights = [AmbientLight(intensity=0.3), PointLight(position=(0.0, 2.5, 3.0), intensity=1.4)]
+
+def main(width=160, height=120, max_depth=8):
+    print(f"Caja de espejos {width}x{height}, packet")
+    print(f"  {'max_depth':>9}{'render':>10}{'pico':>11}  rayos por rebote")
+    for depth in range(1, max_depth + 1):
+        rt = Raytracer(width, height)
+        mirror_box(rt)
+        rt.max_depth = depth
+        rt.build_accel()
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            rt.render(mode="packet")
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        rt.enable_stats()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rt.render(mode="packet")
+        queues = " ".join(str(rt.stats.depths[d]) for d in range(depth + 1))
+        print(f"  {depth:>9}{elapsed:>8.2f} s{peak / 1e6:>8.1f} MB  {queues}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
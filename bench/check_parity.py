@@ -0,0 +1,89 @@
+"""
+Paridad entre los dos caminos de intersección: para cada tipo de figura
+compara ray_intersect (un rayo, escalar) con intersect_many (paquete) en
+los mismos rayos aleatorios (semilla fija): impacto o no, t, normal y UV.
+Termina con código 1 si alguna figura difiere.
+
+    python bench/check_parity.py [rayos] [semilla]
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Textures.figures import (Sphere, Plane, Disk, Triangle, Cube, Cylinder,
+                              Ellipsoid, Torus, TriangleMesh, Instance)
+from Textures.material import Material
+from Textures.MathLib import normalize_many, transform_matrix
+
+TOL = 1e-3
+
+def uv_sphere(center, radius, rings=6):
+    """Malla de esfera UV con normales y UV por esquina."""
+    segments = 2 * rings
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, rings + 1), np.linspace(0, 2 * np.pi, segments + 1), indexing="ij")
+    unit = np.stack([np.sin(theta) * np.cos(phi), np.cos(theta), np.sin(theta) * np.sin(phi)], axis=-1).reshape(-1, 3)
+    uv = np.stack([phi / (2 * np.pi), 1 - theta / np.pi], axis=-1).reshape(-1, 2)
+    faces = []
+    for i in range(rings):
+        for j in range(segments):
+            a = i * (segments + 1) + j
+            b, c, d = a + segments + 1, a + segments + 2, a + 1
+            faces += [(a, c, d), (a, b, c)]
+    faces = np.array(faces)
+    return TriangleMesh(np.asarray(center) + radius * unit, faces, Material(),
+                        normals=unit[faces], uvs=uv[faces])
+
+def shapes():
+    m = Material()
+    return [
+        Sphere((0, 0, -3), 1.0, m),
+        Plane((0, -1, 0), (0, 1, 0), m),
+        Disk((0, 0, -3), (0, 0, 1), 1.5, m),
+        Triangle((-1, -1, -3), (1, -1, -3), (0, 1, -2), m),
+        Cube((-1, -1, -4), (1, 0.5, -2), m),
+        Cylinder((0, 0, -3), 0.7, 1.2, m),
+        Ellipsoid((0, 0, -3), (1.0, 0.5, 0.8), m),
+        Torus((0, 0, -3), 1.0, 0.3, m),
+        uv_sphere((0, 0, -3), 1.2),
+        Instance(Torus((0, 0, 0), 1.0, 0.3, m), transform_matrix((0, 0, -3), (30, 45, 0), 1.2)),
+    ]
+
+def random_rays(n, seed):
+    rng = np.random.default_rng(seed)
+    origins = rng.uniform(-2, 2, (n, 3))
+    origins[:, 2] += 1.5
+    directions = normalize_many(rng.normal(size=(n, 3)) + [0.0, 0.0, -2.0])
+    return origins, directions
+
+def compare(shape, origins, directions):
+    """Cantidad de impactos y de rayos en que ambos caminos difieren."""
+    t, normals, uvs = shape.intersect_many(origins, directions)
+    hits = bad = 0
+    for k in range(len(directions)):
+        hit = shape.ray_intersect(origins[k], directions[k])
+        if hit is None:
+            bad += bool(np.isfinite(t[k]))
+            continue
+        hits += 1
+        if (not np.isfinite(t[k]) or abs(hit.distance - t[k]) > TOL * max(1.0, t[k])
+                or np.abs(hit.normal - normals[k]).max() > TOL
+                or (hit.texcoords is not None and np.abs(np.asarray(hit.texcoords) - uvs[k]).max() > TOL)):
+            bad += 1
+    return hits, bad
+
+def main(n_rays=2000, seed=1):
+    origins, directions = random_rays(n_rays, seed)
+    print(f"{n_rays} rayos aleatorios (semilla {seed})")
+    print(f"  {'figura':<14}{'impactos':>10}{'difieren':>10}")
+    failed = False
+    for shape in shapes():
+        hits, bad = compare(shape, origins, directions)
+        failed |= bad > 0
+        print(f"  {type(shape).__name__:<14}{hits:>10}{bad:>10}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(*args))
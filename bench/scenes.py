@@ -0,0 +1,98 @@
+"""
+Escenas fijas del benchmark. Cada función recibe un Raytracer ya creado
+y lo llena (igual que build_final_scene).
+"""
+import os
+import numpy as np
+
+from Raytracer_Proyecto2 import build_final_scene
+from Textures.material import Material, MAT_REFLECTIVE
+from Textures.lights import AmbientLight, DirectionalLight, PointLight
+from Textures.figures import Plane, Torus, TriangleMesh
+from Textures.obj_loader import load_obj, place_instances
+
+TREE_OBJ = "Lowpoly_tree_sample.obj"
+
+def _lights():
+    return [
+        AmbientLight(intensity=0.35),
+        PointLight(position=(-1.5, 3.5, 3.5), intensity=1.6),
+        DirectionalLight(direction=(0.7, -0.7, -0.3), intensity=0.30),
+    ]
+
+def final_scene(rt):
+    """La escena del proyecto (build_final_scene)."""
+    build_final_scene(rt)
+
+def tree_scene(rt, copies=9):
+    """El árbol OBJ cargado una vez y repetido copies veces en una grilla."""
+    rt.eye = np.array([0.0, 1.5, 9.0], dtype=np.float32)
+    rt.fov = 45.0
+    rt.max_depth = 2
+    rt.envmap = None
+
+    floor = Material(color=(0.8, 0.75, 0.7), kd=0.8, ks=0.2, shininess=40)
+    bark = Material(color=(0.45, 0.3, 0.2), kd=0.85, ks=0.1, shininess=20)
+    leaves = Material(color=(0.3, 0.6, 0.3), kd=0.8, ks=0.2, shininess=60)
+    rt.scene = [Plane(position=(0, -1.0, 0), normal=(0, 1, 0), material=floor)]
+
+    meshes = load_obj(os.path.join(os.path.dirname(os.path.dirname(__file__)), TREE_OBJ),
+                      materials_dict={"Bark": bark, "Tree": leaves}, scale=0.1)
+    side = int(np.ceil(np.sqrt(copies)))
+    for k in range(copies):
+        offset = np.array([(k % side - (side - 1) / 2) * 2.5, 0.0, -(k // side) * 2.5], dtype=np.float32)
+        for mesh in meshes:
+            rt.scene.append(TriangleMesh(mesh.vertices + offset, mesh.faces, mesh.material,
+                                         normals=mesh.normals, uvs=mesh.uvs))
+    rt.lights = _lights()
+
+def forest_scene(rt, count=100, seed=7):
+    """El árbol OBJ cargado una vez y colocado count veces como Instance
+    (rotación y escala aleatorias) sin copiar la malla."""
+    rt.eye = np.array([0.0, 2.0, 9.0], dtype=np.float32)
+    rt.fov = 50.0
+    rt.max_depth = 2
+    rt.envmap = None
+
+    floor = Material(color=(0.8, 0.75, 0.7), kd=0.8, ks=0.2, shininess=40)
+    bark = Material(color=(0.45, 0.3, 0.2), kd=0.85, ks=0.1, shininess=20)
+    leaves = Material(color=(0.3, 0.6, 0.3), kd=0.8, ks=0.2, shininess=60)
+    rt.scene = [Plane(position=(0, -1.0, 0), normal=(0, 1, 0), material=floor)]
+
+    meshes = load_obj(os.path.join(os.path.dirname(os.path.dirname(__file__)), TREE_OBJ),
+                      materials_dict={"Bark": bark, "Tree": leaves}, scale=0.1)
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(count)))
+    for k in range(count):
+        position = ((k % side - (side - 1) / 2) * 1.8 + rng.uniform(-0.4, 0.4), 0.0,
+                    -(k // side) * 1.8 + rng.uniform(-0.4, 0.4))
+        rt.scene.extend(place_instances(meshes, position=position, rotation=(0, rng.uniform(0, 360), 0),
+                                        scale=rng.uniform(0.7, 1.2)))
+    rt.lights = _lights()
+
+def torus_scene(rt, count=16):
+    """Grilla de toros a distintas alturas sobre un piso, la mitad reflejantes."""
+    rt.eye = np.array([0.0, 1.2, 3.5], dtype=np.float32)
+    rt.fov = 45.0
+    rt.max_depth = 3
+    rt.envmap = None
+
+    floor = Material(color=(0.85, 0.8, 0.75), kd=0.8, ks=0.2, shininess=50)
+    matte = Material(color=(0.96, 0.86, 0.84), kd=0.82, ks=0.18, shininess=70)
+    metal = Material(color=(0.75, 0.48, 0.35), kd=0.05, ks=0.95, shininess=300, mtype=MAT_REFLECTIVE)
+    rt.scene = [Plane(position=(0, -1.0, 0), normal=(0, 1, 0), material=floor)]
+
+    side = int(np.ceil(np.sqrt(count)))
+    for k in range(count):
+        x = (k % side - (side - 1) / 2) * 1.4
+        z = -(k // side) * 1.4
+        rt.scene.append(Torus(position=(x, -0.7 + 0.1 * (k % 3), z), R=0.5, r=0.15,
+                              material=metal if k % 2 else matte))
+    rt.lights = _lights()
+
+SCENES = {
+    "final": final_scene,
+    "trees": tree_scene,
+    "forest": forest_scene,
+    "torus": torus_scene,
+}
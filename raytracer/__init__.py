@@ -0,0 +1,3 @@
+from raytracer.scenefile import Scene, load_scene
+from raytracer.cli import render_job, load_jobs, run_jobs
+from raytracer.animation import Animation, Track
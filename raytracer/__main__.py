@@ -0,0 +1,3 @@
+from raytracer.cli import main
+
+main()
@@ -0,0 +1,130 @@
+"""
+Animación por keyframes: cámara (eye, fov) y transformación de figuras
+(desplazamiento, rotación y escala).
+
+    rt = Raytracer(480, 600)
+    build_final_scene(rt)
+    anim = Animation(rt,
+                     eye={0: (0.0, 0.5, 6.5), 47: (1.5, 1.2, 5.0)},
+                     fov={0: 38.0, 47: 45.0},
+                     moves={rt.scene[8]: {0: (0, 0, 0), 24: (0, 0.6, 0), 47: (0, 0, 0)},
+                            rt.scene[9]: {"rotation": {0: (0, 0, 0), 47: (0, 360, 0)},
+                                          "scale": {0: 1.0, 24: 1.5}}})
+    anim.render(range(48), "renders/vuelo_{:04d}.bmp", mode="packet")
+
+La escena se construye una vez: mallas, texturas y el BVH de la escena se
+reutilizan entre cuadros. Cada cuadro sólo reemplaza las figuras movidas
+por una Instance con la matriz del cuadro (sin copiar su geometría) y
+ajusta sus cajas en el BVH (Raytracer.update_accel). Cada cuadro se escribe en su BMP al terminar.
+"""
+import os
+import time
+import numpy as np
+
+from BMP.BMP_Writer import save as save_bmp
+from Textures.figures import Instance
+from Textures.MathLib import transform_matrix
+from Textures.color import tone_map
+
+class Track:
+    """Keyframes {cuadro: valor} (número o vector) con interpolación lineal;
+    antes del primero y después del último se mantiene el valor extremo."""
+    def __init__(self, keys):
+        if not keys:
+            raise ValueError("Track sin keyframes")
+        frames = sorted(keys)
+        self.frames = np.array(frames, dtype=np.float64)
+        self.values = np.array([np.atleast_1d(np.asarray(keys[f], dtype=np.float64)) for f in frames])
+        self.scalar = np.ndim(keys[frames[0]]) == 0
+
+    def __call__(self, frame):
+        value = np.array([np.interp(frame, self.frames, self.values[:, c])
+                          for c in range(self.values.shape[1])])
+        return float(value[0]) if self.scalar else value
+
+class Animation:
+    """
+    rt:    Raytracer con la escena ya construida
+    eye:   {cuadro: (x, y, z)} posición de la cámara
+    fov:   {cuadro: grados}
+    moves: {figura de rt.scene: pistas}. Las pistas son {cuadro: (dx, dy, dz)}
+           (sólo desplazamiento) o un dict con cualquiera de
+           "offset":   {cuadro: (dx, dy, dz)} respecto a su posición original
+           "rotation": {cuadro: (rx, ry, rz)} grados, orden X, Y, Z
+           "scale":    {cuadro: s o (sx, sy, sz)}
+           "pivot":    (x, y, z) centro de rotación y escala; por defecto
+                       el centro de la caja de la figura (o el origen si
+                       no es acotada)
+    """
+    TRACKS = ("offset", "rotation", "scale")
+
+    def __init__(self, rt, eye=None, fov=None, moves=None):
+        self.rt = rt
+        self.eye = Track(eye) if eye else None
+        self.fov = Track(fov) if fov else None
+
+        index = {id(obj): k for k, obj in enumerate(rt.scene)}
+        self.moves = {}
+        for obj, keys in (moves or {}).items():
+            if id(obj) not in index:
+                raise ValueError(f"{obj.type} no está en la escena")
+            self.moves[index[id(obj)]] = (obj, self._tracks(obj, keys))
+
+    def _tracks(self, obj, keys):
+        """(pivote, {nombre: Track}) de las pistas de una figura."""
+        if not all(isinstance(name, str) for name in keys):
+            keys = {"offset": keys}
+        unknown = set(keys) - set(self.TRACKS) - {"pivot"}
+        if unknown:
+            raise ValueError(f"Pistas desconocidas: {sorted(unknown)}")
+        pivot = keys.get("pivot")
+        if pivot is None:
+            lo, hi = obj.bounds()
+            finite = np.all(np.isfinite(lo)) and np.all(np.isfinite(hi))
+            pivot = 0.5 * (np.asarray(lo) + np.asarray(hi)) if finite else np.zeros(3)
+        tracks = {name: Track(keys[name]) for name in self.TRACKS if name in keys}
+        return np.asarray(pivot, dtype=np.float64), tracks
+
+    @staticmethod
+    def _matrix(pivot, tracks, frame):
+        """Matriz objeto -> mundo del cuadro: escala y rota alrededor del pivote y desplaza."""
+        offset = tracks["offset"](frame) if "offset" in tracks else 0.0
+        rotation = tracks["rotation"](frame) if "rotation" in tracks else (0, 0, 0)
+        scale = tracks["scale"](frame) if "scale" in tracks else 1.0
+        if "rotation" not in tracks and "scale" not in tracks:
+            return transform_matrix(offset)
+        return transform_matrix(pivot + offset, rotation, scale) @ transform_matrix(-pivot)
+
+    def apply(self, frame):
+        """Deja rt en el estado del cuadro frame."""
+        rt = self.rt
+        if self.eye is not None:
+            rt.eye = self.eye(frame).astype(np.float32)
+        if self.fov is not None:
+            rt.fov = self.fov(frame)
+        for k, (obj, (pivot, tracks)) in self.moves.items():
+            rt.scene[k] = Instance(obj, self._matrix(pivot, tracks, frame))
+
+    def render(self, frames, out_pattern, mode="scalar", workers=None, gamma=2.2, callback=None):
+        """
+        Renderiza cada cuadro de frames y lo guarda en out_pattern.format(cuadro).
+        callback(frame, path) se llama al escribir cada cuadro.
+        Retorna la lista de archivos escritos.
+        """
+        rt = self.rt
+        out_dir = os.path.dirname(out_pattern)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+        paths = []
+        for frame in frames:
+            t0 = time.perf_counter()
+            self.apply(frame)
+            rt.render(mode=mode, workers=workers)
+            path = out_pattern.format(frame)
+            save_bmp(path, rt.width, rt.height, tone_map(rt.framebuffer, gamma=gamma))
+            print(f"Cuadro {frame}: {time.perf_counter() - t0:.2f} s")
+            paths.append(path)
+            if callback is not None:
+                callback(frame, path)
+        return paths
@@ -0,0 +1,115 @@
+"""
+Render por lotes sin pantalla.
+
+    python -m raytracer render scenes/final.json -o renders/final.bmp --res 960x1200
+    python -m raytracer jobs trabajos.json
+
+Un archivo de trabajos es una lista (o {"defaults": {...}, "jobs": [...]})
+de objetos con los mismos campos que las opciones de render:
+
+    {"defaults": {"res": "480x600", "mode": "packet"},
+     "jobs": [{"scene": "scenes/final.json", "out": "renders/a.bmp"},
+              {"scene": "scenes/final.json", "out": "renders/b.bmp", "res": "960x1200", "workers": 4}]}
+
+Las rutas de un archivo de trabajos son relativas a ese archivo. Todos
+los trabajos corren en el mismo proceso y cada escena se carga una vez.
+No se importa pygame.
+"""
+import argparse
+import json
+import os
+import time
+
+from BMP.BMP_Writer import save as save_bmp
+from Textures.gl import Raytracer
+from Textures.color import tone_map
+from raytracer.scenefile import load_scene
+
+JOB_DEFAULTS = {"res": "480x600", "mode": "scalar", "workers": None, "gamma": 2.2, "stats": False}
+
+def parse_res(res):
+    """'960x1200' o [960, 1200] -> (960, 1200)."""
+    if isinstance(res, str):
+        res = res.lower().split("x")
+    w, h = (int(x) for x in res)
+    return w, h
+
+def render_job(job, scenes=None):
+    """
+    Renderiza un trabajo (dict con scene, out y opcionalmente res, mode,
+    workers, gamma, stats). scenes: caché {ruta: Scene} compartido entre
+    trabajos. Retorna el tiempo de render en segundos.
+    """
+    job = dict(JOB_DEFAULTS, **job)
+    scenes = {} if scenes is None else scenes
+    path = os.path.abspath(job["scene"])
+    if path not in scenes:
+        scenes[path] = load_scene(path)
+
+    w, h = parse_res(job["res"])
+    rt = Raytracer(w, h)
+    scenes[path].apply(rt)
+    if job["stats"]:
+        rt.enable_stats()
+
+    t0 = time.perf_counter()
+    rt.render(mode=job["mode"], workers=job["workers"])
+    elapsed = time.perf_counter() - t0
+
+    out_dir = os.path.dirname(job["out"])
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    fb = tone_map(rt.framebuffer, gamma=job["gamma"])
+    if rt.stats is None:
+        save_bmp(job["out"], w, h, fb)
+    else:
+        rt.stats.timed("bmp_write", save_bmp, job["out"], w, h, fb)
+        print(rt.stats.summary())
+    return elapsed
+
+def load_jobs(path):
+    """Lee un archivo de trabajos; resuelve scene y out relativos a él."""
+    with open(path) as f:
+        desc = json.load(f)
+    if isinstance(desc, list):
+        desc = {"jobs": desc}
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for job in desc["jobs"]:
+        job = dict(desc.get("defaults", {}), **job)
+        for key in ("scene", "out"):
+            job[key] = os.path.join(base, job[key])
+        jobs.append(job)
+    return jobs
+
+def run_jobs(jobs):
+    scenes = {}
+    total = time.perf_counter()
+    for k, job in enumerate(jobs, 1):
+        print(f"[{k}/{len(jobs)}] {job['scene']} -> {job['out']}")
+        elapsed = render_job(job, scenes)
+        print(f"[{k}/{len(jobs)}] {elapsed:.2f} s")
+    print(f"{len(jobs)} trabajos en {time.perf_counter() - total:.2f} s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m raytracer", description="Render sin pantalla.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("render", help="renderiza una escena JSON a BMP")
+    p.add_argument("scene", help="archivo de escena (.json)")
+    p.add_argument("-o", "--out", required=True, help="BMP de salida")
+    p.add_argument("--res", default=JOB_DEFAULTS["res"], help="resolución WxH")
+    p.add_argument("--mode", default=JOB_DEFAULTS["mode"], choices=("scalar", "packet"))
+    p.add_argument("--workers", type=int, default=None, help="procesos para el render por tiles")
+    p.add_argument("--gamma", type=float, default=JOB_DEFAULTS["gamma"])
+    p.add_argument("--stats", action="store_true", help="imprime estadísticas del render")
+
+    p = sub.add_parser("jobs", help="renderiza una lista de trabajos en un solo proceso")
+    p.add_argument("jobs", help="archivo de trabajos (.json)")
+
+    args = parser.parse_args(argv)
+    if args.command == "render":
+        run_jobs([{"scene": args.scene, "out": args.out, "res": args.res, "mode": args.mode,
+                   "workers": args.workers, "gamma": args.gamma, "stats": args.stats}])
+    else:
+        run_jobs(load_jobs(args.jobs))
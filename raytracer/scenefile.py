@@ -0,0 +1,157 @@
+"""
+Escenas declarativas en JSON.
+
+    {
+      "camera":     {"eye": [0, 0.5, 6.5], "fov": 38, "max_depth": 4},
+      "background": [0.7, 0.8, 0.95],
+      "envmap":     "../Textures/env_sky.bmp",
+      "textures":   {"piso": {"type": "checker", "tiles_u": 10, "color_a": "#D4A29A", ...}},
+      "materials":  {"rosa": {"color": "#F5DCD6", "kd": 0.82, "type": "reflective", "texture": "piso"}},
+      "objects":    [{"type": "Torus", "position": [0, 0, 0], "R": 1.1, "r": 0.09, "material": "rosa"},
+                     {"type": "obj", "path": "../arbol.obj", "material": "rosa", "scale": 0.8,
+                      "instances": [{"position": [2, -1, 0]}, {"position": [-2, -1, 0], "rotation": [0, 90, 0]}]}],
+      "lights":     [{"type": "point", "position": [-1.5, 3.5, 3.5], "intensity": 1.8}]
+    }
+
+Los colores son listas RGB en [0,1] o cadenas "#RRGGBB". Las rutas son
+relativas al archivo de escena. Un "obj" con "instances" se carga una vez
+y se coloca como Instance en cada posición (position, rotation, scale,
+material opcional), sin copiar la malla. "envmap_lut": N precalcula la
+LUT octaédrica N x N del env map (EnvMap.build_lut). Los demás campos de
+cada figura, luz, material o textura se pasan tal cual a su constructor.
+"""
+import json
+import os
+import numpy as np
+
+from Textures.material import Material, MAT_DIFFUSE, MAT_REFLECTIVE, MAT_TRANSPARENT
+from Textures.lights import AmbientLight, DirectionalLight, PointLight
+from Textures.figures import Plane, Disk, Sphere, Triangle, Cube, Cylinder, Ellipsoid, Torus
+from Textures.envmap import EnvMap
+from Textures.texture import ImageTexture
+from Textures.checker import CheckerTexture
+from Textures.obj_loader import load_obj, place_instances
+from Textures.color import hexc
+
+SHAPES = {cls.__name__: cls for cls in (Plane, Disk, Sphere, Triangle, Cube, Cylinder, Ellipsoid, Torus)}
+LIGHTS = {"ambient": AmbientLight, "directional": DirectionalLight, "point": PointLight}
+TEXTURES = {"checker": CheckerTexture, "image": ImageTexture}
+MTYPES = {"diffuse": MAT_DIFFUSE, "reflective": MAT_REFLECTIVE, "transparent": MAT_TRANSPARENT}
+
+def _colors(params):
+    """Convierte los campos color* en cadena "#RRGGBB" a tuplas."""
+    return {k: hexc(v) if k.startswith("color") and isinstance(v, str) else v
+            for k, v in params.items()}
+
+def _split(spec, kind):
+    params = dict(spec)
+    try:
+        return params.pop("type"), params
+    except KeyError:
+        raise ValueError(f"{kind} sin 'type': {spec}") from None
+
+def _lookup(table, name, kind):
+    try:
+        return table[name]
+    except KeyError:
+        raise ValueError(f"{kind} desconocido: {name!r} (opciones: {', '.join(table)})") from None
+
+class Scene:
+    """
+    Escena leída de un archivo JSON. Figuras, mallas y texturas se
+    construyen una sola vez; apply(rt) las asigna a cada Raytracer, así
+    un proceso renderiza varios trabajos de la misma escena sin recargar.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self.path) as f:
+            desc = json.load(f)
+
+        # Lo que el archivo no define queda con el valor por defecto del Raytracer
+        camera = desc.get("camera", {})
+        self.eye = np.array(camera["eye"], dtype=np.float32) if "eye" in camera else None
+        self.fov = float(camera["fov"]) if "fov" in camera else None
+        self.max_depth = int(camera["max_depth"]) if "max_depth" in camera else None
+        self.background = np.array(desc["background"], dtype=np.float32) if "background" in desc else None
+
+        self.envmap = None
+        if desc.get("envmap"):
+            envmap_path = self._path(desc["envmap"])
+            if os.path.exists(envmap_path):
+                self.envmap = EnvMap(envmap_path, lut_size=desc.get("envmap_lut"))
+            else:
+                print(f"  Envmap no encontrado ({envmap_path}), se usa el color de fondo")
+
+        textures = {}
+        for name, spec in desc.get("textures", {}).items():
+            kind, params = _split(spec, "Textura")
+            if kind == "image":
+                params["path"] = self._path(params["path"])
+            textures[name] = _lookup(TEXTURES, kind, "Tipo de textura")(**_colors(params))
+
+        self.materials = {}
+        for name, spec in desc.get("materials", {}).items():
+            params = _colors(spec)
+            params["mtype"] = _lookup(MTYPES, params.pop("type", "diffuse"), "Tipo de material")
+            if "texture" in params:
+                params["texture"] = _lookup(textures, params["texture"], "Textura")
+            self.materials[name] = Material(**params)
+
+        self.shapes = []
+        for spec in desc.get("objects", []):
+            kind, params = _split(spec, "Objeto")
+            if kind == "obj":
+                self.shapes.extend(self._load_obj(params))
+            else:
+                params["material"] = self._material(params.get("material"))
+                self.shapes.append(_lookup(SHAPES, kind, "Tipo de figura")(**params))
+
+        self.lights = []
+        for spec in desc.get("lights", []):
+            kind, params = _split(spec, "Luz")
+            self.lights.append(_lookup(LIGHTS, kind, "Tipo de luz")(**_colors(params)))
+
+    def _path(self, path):
+        return os.path.normpath(os.path.join(os.path.dirname(self.path), path))
+
+    def _material(self, name):
+        if name is None:
+            return Material()
+        return _lookup(self.materials, name, "Material")
+
+    def _load_obj(self, params):
+        params["filepath"] = self._path(params.pop("path"))
+        if not os.path.exists(params["filepath"]):
+            raise FileNotFoundError(params["filepath"])
+        params["material"] = self._material(params.get("material"))
+        if "materials" in params:
+            params["materials_dict"] = {k: self._material(v) for k, v in params.pop("materials").items()}
+        placements = params.pop("instances", None)
+        meshes = load_obj(**params)
+        if placements is None:
+            return meshes
+
+        shapes = []
+        for placement in placements:
+            placement = dict(placement)
+            if "material" in placement:
+                placement["material"] = self._material(placement["material"])
+            shapes.extend(place_instances(meshes, **placement))
+        return shapes
+
+    def apply(self, rt):
+        """Configura cámara, fondo, figuras y luces de rt."""
+        if self.eye is not None:
+            rt.eye = self.eye.copy()
+        if self.fov is not None:
+            rt.fov = self.fov
+        if self.max_depth is not None:
+            rt.max_depth = self.max_depth
+        if self.background is not None:
+            rt.backgroundColor = self.background.copy()
+        rt.envmap = self.envmap
+        rt.scene = list(self.shapes)
+        rt.lights = list(self.lights)
+
+def load_scene(path):
+    return Scene(path)